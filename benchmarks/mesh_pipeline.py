@@ -0,0 +1,292 @@
+"""
+Benchmark del camino 3D (DetailPanel) con mallas sintéticas.
+
+Genera archivos .obj de triángulos, cuadriláteros y n-ágonos (hexágonos)
+de distintos tamaños y mide, con matplotlib en modo Agg (sin ventana):
+
+    parse         meshio.read
+    triangulate   mesh_loader.triangulate
+    auto_scale    model_bounds.set_axes_limits con la caja de la malla
+    figure        crear la figura 3D y plot_trisurf (con el mismo nivel
+                  de detalle que usa DetailPanel)
+    first_draw    primer dibujado de la figura
+
+Los tiempos son el mínimo de --repeat corridas. En una pasada aparte
+(para no alterar los tiempos) se mide con tracemalloc el pico de memoria
+de cada etapa, por encima de lo ya asignado. Los resultados se guardan
+en JSON para compararlos entre versiones:
+
+    python benchmarks/mesh_pipeline.py --output base.json
+    python benchmarks/mesh_pipeline.py --compare base.json --output nuevo.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')  # sin ventana: debe ir antes de importar pyplot
+
+import numpy as np
+import meshio
+import matplotlib.pyplot as plt
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from data.mesh_loader import triangulate
+from data.model_bounds import set_axes_limits
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 5_000_000]
+FACE_TYPES = {'triangle': 3, 'quad': 4, 'ngon': 6}
+STAGES = ['parse', 'triangulate', 'auto_scale', 'figure', 'first_draw']
+# Caras máximas a dibujar: el mismo valor que DetailPanel.max_render_faces
+# (el benchmark no importa la interfaz, que necesita tkinter)
+MAX_RENDER_FACES = 200_000
+
+
+# --- Mallas sintéticas ---
+
+def _grid(rows, cols):
+    """Vértices de una superficie ondulada de (rows + 1) x (cols + 1)."""
+    u, v = np.meshgrid(np.linspace(0, 4 * np.pi, cols + 1), np.linspace(0, 4 * np.pi, rows + 1))
+    w = np.sin(u) * np.cos(v)
+    return np.column_stack([u.ravel(), v.ravel(), w.ravel()])
+
+
+def synthetic_faces(face_type, n_faces):
+    """
+    Devuelve (points, faces) con aproximadamente 'n_faces' caras del tipo
+    pedido. Los índices de 'faces' empiezan en 0.
+    """
+    if face_type == 'ngon':
+        # Cada hexágono une dos celdas vecinas de la cuadrícula
+        cols = max(2, int(np.sqrt(n_faces * 2)) // 2 * 2)
+        rows = max(1, n_faces * 2 // cols)
+    elif face_type == 'triangle':
+        cols = max(1, int(np.sqrt(n_faces / 2)))
+        rows = max(1, n_faces // (2 * cols))
+    else:
+        cols = max(1, int(np.sqrt(n_faces)))
+        rows = max(1, n_faces // cols)
+
+    points = _grid(rows, cols)
+    r, c = np.meshgrid(np.arange(rows), np.arange(cols), indexing='ij')
+    top_left = (r * (cols + 1) + c).ravel()
+    top_right = top_left + 1
+    bottom_left = top_left + cols + 1
+    bottom_right = bottom_left + 1
+
+    if face_type == 'triangle':
+        faces = np.vstack([
+            np.column_stack([top_left, top_right, bottom_right]),
+            np.column_stack([top_left, bottom_right, bottom_left]),
+        ])
+    elif face_type == 'quad':
+        faces = np.column_stack([top_left, top_right, bottom_right, bottom_left])
+    else:
+        even = (c.ravel() % 2) == 0
+        tl, tr, br, bl = top_left[even], top_right[even], bottom_right[even], bottom_left[even]
+        faces = np.column_stack([tl, tr, tr + 1, br + 1, br, bl])
+    return points, faces
+
+
+def write_obj(path, points, faces):
+    """Escribe un .obj (índices base 1) de forma vectorizada."""
+    with open(path, 'w') as f:
+        f.write(f"# malla sintética: {len(points)} vértices, {len(faces)} caras\n")
+        np.savetxt(f, points, fmt='v %.6f %.6f %.6f')
+        np.savetxt(f, faces + 1, fmt='f' + ' %d' * faces.shape[1])
+
+
+# --- Medición ---
+
+def run_pipeline(obj_path, timings=None, probe=None):
+    """
+    Ejecuta el camino completo de DetailPanel sobre 'obj_path'.
+    Si 'timings' es un diccionario, guarda ahí el tiempo de cada etapa.
+    'probe(nombre)' es un context manager opcional que envuelve cada etapa.
+    """
+    results = {}
+
+    def stage(name, func):
+        with probe(name) if probe else contextlib.nullcontext():
+            start = time.perf_counter()
+            value = func()
+            elapsed = time.perf_counter() - start
+        if timings is not None:
+            timings[name] = elapsed
+        return value
+
+    mesh = stage('parse', lambda: meshio.read(obj_path))
+    cells = stage('triangulate', lambda: triangulate(mesh))
+    points = mesh.points
+    x, y, z = points[:, 0], points[:, 1], points[:, 2]
+
+    def auto_scale(axes):
+        set_axes_limits(axes, (x.min(), y.min(), z.min()), (x.max(), y.max(), z.max()))
+
+    figure = plt.figure(figsize=(5, 4))
+    ax = figure.add_subplot(111, projection='3d')
+    stage('auto_scale', lambda: auto_scale(ax))
+    plt.close(figure)
+
+    # Mismo nivel de detalle que DetailPanel.show_mesh
+    drawn = cells
+    if len(cells) > MAX_RENDER_FACES:
+        step = -(-len(cells) // MAX_RENDER_FACES)
+        drawn = cells[::step]
+
+    def make_figure():
+        fig = plt.figure(figsize=(5, 4))
+        fig.patch.set_facecolor('#f7f7f7')
+        axes = fig.add_subplot(111, projection='3d')
+        axes.set_facecolor('#f7f7f7')
+        axes.plot_trisurf(x, y, z, triangles=drawn, cmap='viridis', edgecolor='none')
+        auto_scale(axes)
+        return fig
+
+    figure = stage('figure', make_figure)
+    stage('first_draw', figure.canvas.draw)
+    plt.close(figure)
+
+    results['vertices'] = int(len(points))
+    results['triangles'] = int(len(cells))
+    results['triangles_drawn'] = int(len(drawn))
+    return results
+
+
+def measure_memory(obj_path):
+    """Pico de memoria (bytes) de cada etapa, medido con tracemalloc."""
+    peaks = {}
+
+    @contextlib.contextmanager
+    def probe(name):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        yield
+        peaks[name] = tracemalloc.get_traced_memory()[1] - base
+
+    tracemalloc.start()
+    try:
+        run_pipeline(obj_path, probe=probe)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def benchmark(sizes, face_types, repeat, memory, workdir):
+    rows = []
+    for face_type in face_types:
+        for n_faces in sizes:
+            points, faces = synthetic_faces(face_type, n_faces)
+            obj_path = os.path.join(workdir, f"{face_type}_{n_faces}.obj")
+            write_obj(obj_path, points, faces)
+            print(f"{face_type:>8} {len(faces):>9} caras ... ", end='', flush=True)
+
+            best = {}
+            info = {}
+            for _ in range(repeat):
+                timings = {}
+                info = run_pipeline(obj_path, timings)
+                for name, seconds in timings.items():
+                    best[name] = min(seconds, best.get(name, float('inf')))
+
+            row = {
+                'face_type': face_type,
+                'faces': int(len(faces)),
+                'obj_bytes': os.path.getsize(obj_path),
+                **info,
+                'seconds': best,
+            }
+            if memory:
+                row['peak_bytes'] = measure_memory(obj_path)
+            rows.append(row)
+            os.remove(obj_path)
+            print(f"{sum(best.values()):.3f} s")
+    return rows
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'meshio': meshio.__version__,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def load_baseline(baseline_path):
+    """Resultados de una corrida anterior, por (tipo de cara, caras)."""
+    with open(baseline_path, encoding='utf-8') as f:
+        return {
+            (row['face_type'], row['faces']): row for row in json.load(f)['results']
+        }
+
+
+def compare(rows, baseline, baseline_path):
+    """Imprime la razón actual/base del tiempo de cada etapa."""
+    print(f"\nComparación contra {baseline_path} (actual / base, >1 es más lento):")
+    print(f"{'tipo':>8} {'caras':>9} " + ' '.join(f"{name:>12}" for name in STAGES))
+    for row in rows:
+        base = baseline.get((row['face_type'], row['faces']))
+        if not base:
+            continue
+        ratios = []
+        for name in STAGES:
+            old = base['seconds'].get(name)
+            ratios.append(f"{row['seconds'][name] / old:12.2f}" if old else f"{'-':>12}")
+        print(f"{row['face_type']:>8} {row['faces']:>9} " + ' '.join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del camino de mallas 3D.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Número aproximado de caras de cada malla")
+    parser.add_argument('--types', nargs='+', choices=sorted(FACE_TYPES), default=list(FACE_TYPES),
+                        help="Tipos de cara a generar")
+    parser.add_argument('--repeat', type=int, default=3, help="Corridas por malla (se toma la mínima)")
+    parser.add_argument('--no-memory', action='store_true', help="No medir memoria con tracemalloc")
+    parser.add_argument('--output', '-o', default='bench_output.json', help="Archivo JSON de resultados")
+    parser.add_argument('--compare', help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    # La base se lee antes de correr (y antes de escribir --output, que
+    # puede ser el mismo archivo)
+    baseline = None
+    if args.compare:
+        if os.path.abspath(args.compare) == os.path.abspath(args.output):
+            parser.error("--compare y --output apuntan al mismo archivo; usa otro --output")
+        try:
+            baseline = load_baseline(args.compare)
+        except (OSError, ValueError, KeyError) as e:
+            parser.error(f"No se pudo leer la base '{args.compare}': {e}")
+
+    with tempfile.TemporaryDirectory(prefix='bench_mallas_') as workdir:
+        rows = benchmark(args.sizes, args.types, args.repeat, not args.no_memory, workdir)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': rows}, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+    if baseline is not None:
+        compare(rows, baseline, args.compare)
+
+
+if __name__ == '__main__':
+    main()
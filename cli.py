@@ -0,0 +1,136 @@
+"""
+Modo de consulta por línea de comandos (sin Tk ni matplotlib).
+
+Ejemplos:
+    python cli.py search yucat --format csv
+    python cli.py search michoakan --ranked --limit 5
+    python cli.py state "Jalisco"
+    python cli.py export --output catalogo.jsonl
+    python cli.py states
+"""
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+
+# Solo se importa el controlador: nada de interfaz gráfica
+from data.app_controller import AppController, DB_PATH
+
+
+def write_jsonl(rows, out):
+    """Escribe cada fila como un objeto JSON por línea."""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False))
+        out.write('\n')
+        count += 1
+    return count
+
+
+def write_csv(rows, out):
+    """Escribe las filas como CSV; la cabecera sale de la primera fila."""
+    writer = None
+    count = 0
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(out, fieldnames=list(row.keys()))
+            writer.writeheader()
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+WRITERS = {
+    'jsonl': write_jsonl,
+    'csv': write_csv,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Consulta y exporta el catálogo de fauna sin abrir la interfaz."
+    )
+    parser.add_argument('--db', default=DB_PATH, help="Ruta a animales.db")
+
+    # Opciones de salida comunes a todos los subcomandos
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--format', choices=sorted(WRITERS), default='jsonl',
+                        help="Formato de salida (por defecto: jsonl)")
+    output.add_argument('--output', '-o', default='-',
+                        help="Archivo de salida ('-' para la salida estándar)")
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search = subparsers.add_parser('search', parents=[output], help="Buscar por nombre común, científico o estado")
+    search.add_argument('term')
+    search.add_argument('--ranked', action='store_true',
+                        help="Ordenar por similitud en lugar de por estado")
+    search.add_argument('--limit', type=int, default=50,
+                        help="Máximo de resultados con --ranked (por defecto: 50)")
+
+    state = subparsers.add_parser('state', parents=[output], help="Listar los animales de un estado")
+    state.add_argument('name')
+
+    subparsers.add_parser('export', parents=[output], help="Exportar todo el catálogo")
+    subparsers.add_parser('states', parents=[output], help="Listar los nombres de los estados")
+    return parser
+
+
+def run(args, controller, out):
+    """Ejecuta el subcomando y devuelve el código de salida."""
+    if args.command == 'states':
+        for state_name in controller.load_initial_states():
+            out.write(f"{state_name}\n")
+        return 0
+
+    if args.command == 'search' and args.ranked:
+        rows = controller.search_animals(args.term, limit=args.limit)
+    elif args.command == 'search':
+        rows = controller.iter_animals(search_term=args.term)
+    elif args.command == 'state':
+        if args.name not in controller.load_initial_states():
+            print(f"Estado no encontrado: {args.name}")
+            return 1
+        rows = controller.iter_animals(state_name=args.name)
+    else:
+        rows = controller.iter_animals()
+
+    count = WRITERS[args.format](rows, out)
+    print(f"{count} animales exportados.")
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Error: No se encontró la base de datos '{args.db}'.", file=sys.stderr)
+        return 1
+
+    if args.output == '-':
+        out = sys.stdout
+    else:
+        out = open(args.output, 'w', encoding='utf-8', newline='')
+
+    # Los mensajes del controlador van a stderr para no mezclarse con los datos
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            controller = AppController(args.db)
+            try:
+                return run(args, controller, out)
+            finally:
+                controller.conn.close()
+    except BrokenPipeError:
+        # p. ej. 'python cli.py export | head': evitar otro error al cerrar stdout
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
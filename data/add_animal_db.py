@@ -1,5 +1,11 @@
 import sqlite3
 import os
+import sys
+
+# Permite importar 'data.*' aunque se ejecute como 'python data/add_animal_db.py'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.search_index import ensure_search_index, index_animal
+from data.asset_preprocess import ASSET_COLUMNS, ensure_asset_columns, preprocess_animals
 
 nuevos_animales = []
 DB_FILE = os.path.join(os.getcwd(), 'data', 'animales.db')
@@ -85,6 +91,10 @@ def agregar_animales_a_db():
         cursor = conn.cursor()
         print(f"Conectado a '{DB_FILE}'.")
 
+        # Asegurar que el índice de búsqueda y las columnas de metadatos existan
+        ensure_search_index(conn)
+        ensure_asset_columns(conn)
+
         # --- 1. OBTENER DATOS PARA VALIDACIÓN ---
         print("Cargando datos existentes para validación...")
         
@@ -114,6 +124,24 @@ def agregar_animales_a_db():
         else:
             print("¡Todas las validaciones pasaron!")
 
+        if not animales_para_insertar:
+            print("\nNo hay animales válidos para agregar. Terminando.")
+            return
+
+        # --- 3b. PROCESAR ARCHIVOS (en paralelo) ---
+        # Parsear y triangular cada malla, rechazar las que no sirvan,
+        # y guardar su caja envolvente, conteos y miniatura.
+        print(f"\nProcesando los archivos de {len(animales_para_insertar)} animales...")
+        metadatos, errores_archivos = preprocess_animals(animales_para_insertar)
+        if errores_archivos:
+            print(f"Se rechazaron {len(errores_archivos)} animales por sus archivos:")
+            for error in errores_archivos:
+                print(error)
+        animales_para_insertar = [
+            dict(animal, **datos)
+            for animal, datos in zip(animales_para_insertar, metadatos) if datos
+        ]
+
         if not animales_para_insertar:
             print("\nNo hay animales válidos para agregar. Terminando.")
             return
@@ -127,18 +155,26 @@ def agregar_animales_a_db():
                 # El estado_id ya fue validado, así que lo podemos tomar con seguridad
                 estado_id = mapa_estados_id[animal["estado_nombre"]]
 
-                cursor.execute("""
+                columnas_archivos = list(ASSET_COLUMNS)
+                cursor.execute(f"""
                     INSERT INTO animales 
-                    (nombre_comun, nombre_cientifico, descripcion, ruta_modelo_3d, ruta_img, estado_id)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    (nombre_comun, nombre_cientifico, descripcion, ruta_modelo_3d, ruta_img, estado_id,
+                     {', '.join(columnas_archivos)})
+                    VALUES (?, ?, ?, ?, ?, ?, {', '.join('?' * len(columnas_archivos))})
                 """, (
                     animal["nombre_comun"],
                     animal["nombre_cientifico"],
                     animal["descripcion"],
                     animal["ruta_modelo_3d"],
                     animal["ruta_img"],
-                    estado_id
+                    estado_id,
+                    *(animal[columna] for columna in columnas_archivos)
                 ))
+                # Actualizar el índice de búsqueda solo con este animal
+                index_animal(
+                    cursor, cursor.lastrowid, animal["nombre_comun"],
+                    animal["nombre_cientifico"], animal["estado_nombre"]
+                )
                 print(f"  Éxito: Se agregó '{animal['nombre_comun']}' a la base de datos.")
                 total_agregados += 1
             
@@ -1,5 +1,14 @@
 import sqlite3
 import os
+import base64
+import json
+from pathlib import Path
+
+from data.search_index import (
+    ensure_search_index, index_animal, match_condition, correlated_match_condition,
+    has_exact_match, prefers_index_walk, rank
+)
+
 DB_PATH = os.path.join(os.getcwd(), 'data', 'animales.db')
 # Función útil para convertir los resultados de SQLite (tuplas)
 # en diccionarios, que es lo que tu vista espera.
@@ -9,11 +18,88 @@ def _dict_factory(cursor, row):
         d[col[0]] = row[idx]
     return d
 
+# Resumen por estado (número de animales) mantenido por triggers,
+# más un índice para recorrer los animales de un estado en orden.
+_SUMMARY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumen_estados (
+    estado_id INTEGER PRIMARY KEY REFERENCES estados(id),
+    total INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_animales_estado_nombre
+    ON animales(estado_id, nombre_comun, id);
+
+CREATE TRIGGER IF NOT EXISTS trg_estados_insert AFTER INSERT ON estados
+BEGIN
+    INSERT OR IGNORE INTO resumen_estados (estado_id, total) VALUES (NEW.id, 0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_animales_insert AFTER INSERT ON animales
+BEGIN
+    INSERT OR IGNORE INTO resumen_estados (estado_id, total) VALUES (NEW.estado_id, 0);
+    UPDATE resumen_estados SET total = total + 1 WHERE estado_id = NEW.estado_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_animales_delete AFTER DELETE ON animales
+BEGIN
+    UPDATE resumen_estados SET total = total - 1 WHERE estado_id = OLD.estado_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_animales_update_estado
+AFTER UPDATE OF estado_id ON animales
+WHEN OLD.estado_id IS NOT NEW.estado_id
+BEGIN
+    UPDATE resumen_estados SET total = total - 1 WHERE estado_id = OLD.estado_id;
+    INSERT OR IGNORE INTO resumen_estados (estado_id, total) VALUES (NEW.estado_id, 0);
+    UPDATE resumen_estados SET total = total + 1 WHERE estado_id = NEW.estado_id;
+END;
+"""
+
+
+def ensure_summary_schema(conn):
+    """
+    Crea la tabla 'resumen_estados' y sus triggers si aún no existen
+    (bases de datos creadas antes de este cambio) y la llena una vez.
+    """
+    existing = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'resumen_estados'"
+    ).fetchone()
+    if existing:
+        return
+
+    conn.executescript("BEGIN;" + _SUMMARY_SCHEMA + """
+        INSERT OR REPLACE INTO resumen_estados (estado_id, total)
+        SELECT e.id, COUNT(a.id)
+        FROM estados e
+        LEFT JOIN animales a ON a.estado_id = e.id
+        GROUP BY e.id;
+        COMMIT;
+    """)
+
+
 class AppController:
-    def __init__(self, db_path=DB_PATH):
+    def __init__(self, db_path=DB_PATH, bundle=None, read_only=False):
+        # Paquete de catálogo (CatalogBundle) opcional: si se da, la DB se
+        # carga desde él y las miniaturas/mallas se leen del mismo archivo.
+        self.bundle = bundle
+
         # Conectar a la base de datos
         # 'check_same_thread=False' es importante para tkinter
-        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        if bundle is not None:
+            db_path = bundle.path
+            self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+            self.conn.deserialize(bundle.catalog_bytes())
+        elif read_only:
+            # Solo lectura (p. ej. los hilos del servidor): no ejecuta DDL
+            # ni migraciones, que ya debió hacer quien abrió la DB primero
+            # (la URI escapa '?', '#' y '%' de la ruta)
+            uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        if not read_only:
+            ensure_summary_schema(self.conn)
+            ensure_search_index(self.conn)
         
         # Configurar la conexión para que devuelva diccionarios
         self.conn.row_factory = _dict_factory
@@ -33,6 +119,25 @@ class AppController:
             print(f"Error al cargar estados: {e}")
             return []
 
+    def load_state_summary(self, only_non_empty=False):
+        """
+        Devuelve [{'nombre': ..., 'total': ...}] para cada estado, leyendo
+        la tabla de resumen (sin tocar la tabla de animales).
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(f"""
+                SELECT e.nombre, r.total
+                FROM resumen_estados r
+                JOIN estados e ON r.estado_id = e.id
+                {"WHERE r.total > 0" if only_non_empty else ""}
+                ORDER BY e.nombre ASC
+            """)
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error al cargar el resumen de estados: {e}")
+            return []
+
     def load_animals_by_state(self, state_name):
         """
         Devuelve la lista de animales para un estado específico.
@@ -73,33 +178,17 @@ class AppController:
         search_term_lower = search_term.lower().strip()
         
         if not search_term_lower or search_term == '':
-            # Si no hay búsqueda, llamamos a la lógica original (o una versión optimizada)
-            # Por simplicidad, devolvemos todo agrupado
+            # Si no hay búsqueda, devolvemos todo agrupado.
+            # El resumen nos dice qué estados tienen animales sin consultarlos.
             all_data = {}
-            for state in self.load_initial_states():
-                all_data[state] = self.load_animals_by_state(state)
+            for summary in self.load_state_summary(only_non_empty=True):
+                all_data[summary['nombre']] = self.load_animals_by_state(summary['nombre'])
             return all_data
 
-        # Preparamos el término de búsqueda para SQL (con comodines '%')
-        query_term = f"%{search_term_lower}%"
-
         try:
-            cursor = self.conn.cursor()
-            # Esta es la consulta mágica de SQL.
-            # Busca el término en el nombre del animal, el nombre científico
-            # O el nombre del estado al que pertenece.
-            cursor.execute("""
-                SELECT a.*, e.nombre as estado
-                FROM animales a
-                JOIN estados e ON a.estado_id = e.id
-                WHERE 
-                    LOWER(a.nombre_comun) LIKE ? OR
-                    LOWER(a.nombre_cientifico) LIKE ? OR
-                    LOWER(e.nombre) LIKE ?
-                ORDER BY e.nombre, a.nombre_comun
-            """, (query_term, query_term, query_term))
-            
-            results = cursor.fetchall() # Lista de todos los animales que coinciden
+            # Los animales que coinciden (sin acentos y tolerando errores),
+            # ordenados por estado y nombre.
+            results = list(self.iter_animals(search_term=search_term)) # Lista de todos los animales que coinciden
             
             # Ahora agrupamos los resultados por estado (como espera tu vista)
             filtered_data = {}
@@ -115,6 +204,248 @@ class AppController:
             print(f"Error al filtrar datos: {e}")
             return {}
 
+    def _animal_filters(self, search_term=None, state_name=None, correlated=False):
+        """
+        Construye las condiciones WHERE (y sus parámetros) comunes a las
+        consultas de animales: estado exacto y/o término de búsqueda.
+        Con 'correlated' la búsqueda se revisa fila por fila (ver
+        correlated_match_condition).
+        """
+        conditions = []
+        params = []
+        if state_name is not None:
+            conditions.append("e.nombre = ?")
+            params.append(state_name)
+
+        # Búsqueda sin acentos (índice de trigramas). Las coincidencias
+        # aproximadas (errores de dedo) solo cuentan si no hay exactas.
+        match = None
+        if search_term and search_term.strip():
+            fuzzy = not has_exact_match(self.conn, search_term)
+            build = correlated_match_condition if correlated else match_condition
+            match = build(search_term, fuzzy=fuzzy)
+        if match:
+            conditions.append(match[0])
+            params.extend(match[1])
+        return conditions, params
+
+    def iter_animals(self, search_term=None, state_name=None, batch_size=500):
+        """
+        Generador que recorre los animales fila por fila (ordenados por
+        estado y nombre) sin materializar el resultado completo.
+        Acepta el mismo término de búsqueda que get_filtered_data y,
+        opcionalmente, restringe a un estado.
+        """
+        conditions, params = self._animal_filters(search_term, state_name)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            # Cursor propio: así el generador no choca con otras consultas
+            cursor = self.conn.cursor()
+            cursor.execute(f"""
+                SELECT a.*, e.nombre as estado
+                FROM animales a
+                JOIN estados e ON a.estado_id = e.id
+                {where}
+                ORDER BY e.nombre, a.nombre_comun, a.id
+            """, params)
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        except sqlite3.Error as e:
+            print(f"Error al recorrer animales: {e}")
+
+    # --- Paginación por llave (keyset) ---
+
+    @staticmethod
+    def _encode_cursor(animal):
+        """Cursor opaco con la llave (estado, nombre_comun, id) de la última fila."""
+        key = [animal['estado'], animal['nombre_comun'], animal['id']]
+        return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            estado, nombre_comun, animal_id = json.loads(base64.urlsafe_b64decode(cursor))
+            return estado, nombre_comun, int(animal_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Cursor de paginación inválido: {cursor!r}") from e
+
+    def _load_page(self, search_term, state_name, page_size, cursor):
+        """
+        Devuelve (animales, siguiente_cursor). Se pide una fila extra para
+        saber si hay otra página; 'siguiente_cursor' es None al final.
+
+        Normalmente los estados se recorren por nombre y, dentro de cada
+        uno, los animales por el índice (estado_id, nombre_comun, id): las
+        filas salen ya en orden y la búsqueda se revisa fila por fila, así
+        que LIMIT corta en cuanto se llena la página aunque haya miles de
+        coincidencias. Si la búsqueda tiene pocas coincidencias (listas de
+        trigramas cortas) se reúnen primero y se ordenan.
+        """
+        walk = True
+        if search_term:
+            try:
+                walk = prefers_index_walk(self.conn, search_term)
+            except sqlite3.Error as e:
+                print(f"Error al revisar el índice de búsqueda: {e}")
+        conditions, params = self._animal_filters(search_term, state_name, correlated=walk)
+        if cursor is not None:
+            estado, nombre_comun, animal_id = self._decode_cursor(cursor)
+            # 'e.nombre >= ?' deja saltar directo al estado del cursor
+            conditions.append("e.nombre >= ? AND (e.nombre, a.nombre_comun, a.id) > (?, ?, ?)")
+            params.extend([estado, estado, nombre_comun, animal_id])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        try:
+            db_cursor = self.conn.cursor()
+            db_cursor.execute(f"""
+                SELECT a.*, e.nombre as estado
+                {"FROM estados e CROSS JOIN animales a" if walk else "FROM animales a JOIN estados e"}
+                    ON a.estado_id = e.id
+                {where}
+                ORDER BY e.nombre, a.nombre_comun, a.id
+                LIMIT ?
+            """, params + [page_size + 1])
+            animals = db_cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error al cargar página de animales: {e}")
+            return [], None
+
+        if len(animals) > page_size:
+            animals = animals[:page_size]
+            return animals, self._encode_cursor(animals[-1])
+        return animals, None
+
+    def load_animals_by_state_page(self, state_name, page_size=50, cursor=None):
+        """
+        Versión paginada de load_animals_by_state.
+        Devuelve (animales, siguiente_cursor).
+        """
+        return self._load_page(None, state_name, page_size, cursor)
+
+    def get_filtered_page(self, search_term, page_size=50, cursor=None):
+        """
+        Versión paginada de get_filtered_data. Los animales vienen
+        ordenados por estado, pero sin agrupar.
+        Devuelve (animales, siguiente_cursor).
+        """
+        return self._load_page(search_term, None, page_size, cursor)
+
+    def filter_matching_ids(self, search_term, animal_ids):
+        """Devuelve el conjunto de IDs de 'animal_ids' que coinciden con la búsqueda."""
+        animal_ids = list(animal_ids)
+        if not animal_ids:
+            return set()
+        conditions, params = self._animal_filters(search_term, correlated=True)
+        conditions.append(f"a.id IN ({', '.join('?' * len(animal_ids))})")
+        try:
+            cursor = self.conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT a.id
+                FROM animales a
+                JOIN estados e ON a.estado_id = e.id
+                WHERE {' AND '.join(conditions)}
+            """, params + animal_ids)
+            return {row[0] for row in cursor.fetchall()}
+        except sqlite3.Error as e:
+            print(f"Error al filtrar animales: {e}")
+            return set()
+
+    def search_animals(self, search_term, limit=50):
+        """
+        Devuelve los animales que coinciden con la búsqueda ordenados por
+        similitud (mejor primero). Cada diccionario incluye 'puntaje'.
+        """
+        try:
+            ranked = rank(self.conn, search_term, limit)
+        except sqlite3.Error as e:
+            print(f"Error al buscar animales: {e}")
+            return []
+
+        results = []
+        for animal_id, score in ranked:
+            animal = self.get_animal(animal_id)
+            if animal:
+                animal['puntaje'] = round(score, 3)
+                results.append(animal)
+        return results
+
+    def refresh_search_index(self, modified_ids=()):
+        """
+        Pone al día el índice de búsqueda tras cambios hechos por otras
+        conexiones: agrega/quita los animales nuevos/borrados y reindexa
+        los modificados (los triggers del índice ya los sacaron; con
+        'modified_ids' también se cubren bases escritas antes de que
+        existieran los triggers).
+        """
+        try:
+            ensure_search_index(self.conn)
+            cursor = self.conn.cursor()
+            for animal_id in modified_ids:
+                animal = self.get_animal(animal_id)
+                if animal:
+                    index_animal(cursor, animal_id, animal['nombre_comun'],
+                                 animal['nombre_cientifico'], animal['estado'])
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error al actualizar el índice de búsqueda: {e}")
+
+    def animals_with_models(self, rutas_modelo):
+        """Animales (id, ruta_modelo_3d, ruta_img) que usan alguno de los modelos dados."""
+        rutas_modelo = list(rutas_modelo)
+        if not rutas_modelo:
+            return []
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(f"""
+                SELECT id, ruta_modelo_3d, ruta_img FROM animales
+                WHERE ruta_modelo_3d IN ({', '.join('?' * len(rutas_modelo))})
+            """, rutas_modelo)
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error al buscar animales por modelo: {e}")
+            return []
+
+    def save_asset_metadata(self, animal_ids, metadatos):
+        """
+        Guarda los mismos metadatos de archivos (caja envolvente, conteos,
+        miniatura; ver asset_preprocess) en varios animales. Con None se
+        borran, para que nadie use los de un archivo que ya no es el mismo.
+        """
+        from data.asset_preprocess import ASSET_COLUMNS, ensure_asset_columns
+        try:
+            ensure_asset_columns(self.conn)
+            valores = metadatos or dict.fromkeys(ASSET_COLUMNS)
+            asignaciones = ', '.join(f"{column} = :{column}" for column in ASSET_COLUMNS)
+            self.conn.executemany(
+                f"UPDATE animales SET {asignaciones} WHERE id = :id",
+                [dict(valores, id=animal_id) for animal_id in animal_ids]
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error al guardar los metadatos de archivos: {e}")
+
+    def get_animal(self, animal_id):
+        """
+        Devuelve el diccionario de un animal (con su estado) por ID.
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                SELECT a.*, e.nombre as estado
+                FROM animales a
+                JOIN estados e ON a.estado_id = e.id
+                WHERE a.id = ?
+            """, (animal_id,))
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            print(f"Error al cargar animal: {e}")
+            return None
+
     def load_img_name(self, animal_id):
         """
         Obtiene una sola ruta de imagen por ID.
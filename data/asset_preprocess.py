@@ -0,0 +1,175 @@
+import os
+import sys
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+# Permite importar 'data.*' aunque se ejecute como 'python data/asset_preprocess.py'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.asset_store import asset_store
+from data.mesh_loader import parse_mesh, UnsupportedMeshError
+
+DB_FILE = os.path.join(os.getcwd(), 'data', 'animales.db')
+
+THUMBNAIL_SIZE = (100, 100)
+THUMBNAIL_DIR = 'miniaturas'  # dentro de img/
+MAX_MODEL_FACES = 5_000_000
+
+# Columnas nuevas en 'animales' con los datos precalculados de cada archivo
+ASSET_COLUMNS = {
+    'modelo_hash': 'TEXT',  # hash del .obj con el que se calcularon los demás
+    'modelo_vertices': 'INTEGER',
+    'modelo_caras': 'INTEGER',
+    'modelo_min_x': 'REAL',
+    'modelo_min_y': 'REAL',
+    'modelo_min_z': 'REAL',
+    'modelo_max_x': 'REAL',
+    'modelo_max_y': 'REAL',
+    'modelo_max_z': 'REAL',
+    'ruta_miniatura': 'TEXT',
+}
+
+
+def ensure_asset_columns(conn):
+    """Añade a 'animales' las columnas de ASSET_COLUMNS que falten."""
+    cursor = conn.cursor()
+    cursor.row_factory = None  # tuplas, aunque la conexión use diccionarios
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(animales)").fetchall()}
+    for column, column_type in ASSET_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE animales ADD COLUMN {column} {column_type}")
+    conn.commit()
+
+
+def resolve_asset(base_dir, folder, ruta):
+    """
+    Ruta completa de un archivo: primero dentro de su carpeta (como lo
+    busca la vista), si no, relativa a la raíz del proyecto.
+    """
+    in_folder = os.path.join(base_dir, folder, ruta)
+    if os.path.exists(in_folder):
+        return in_folder
+    return os.path.join(base_dir, ruta)
+
+
+def preprocess_animal(ruta_modelo_3d, ruta_img, base_dir):
+    """
+    Procesa los archivos de un animal (corre en un proceso del pool):
+    parsea y triangula la malla, la valida, calcula su caja envolvente y
+    genera la miniatura. Devuelve un diccionario con ASSET_COLUMNS.
+    Lanza UnsupportedMeshError (u otra excepción) si el archivo no sirve.
+    """
+    model_path = resolve_asset(base_dir, 'models', ruta_modelo_3d)
+    points, cells = parse_mesh(model_path)
+    if len(points) == 0:
+        raise UnsupportedMeshError("El modelo no tiene vértices.")
+    if len(cells) > MAX_MODEL_FACES:
+        raise UnsupportedMeshError(
+            f"El modelo tiene {len(cells)} caras (máximo {MAX_MODEL_FACES})."
+        )
+    if cells.min() < 0 or cells.max() >= len(points):
+        raise UnsupportedMeshError("El modelo tiene caras con índices fuera de rango.")
+    if not np.isfinite(points).all():
+        raise UnsupportedMeshError("El modelo tiene coordenadas inválidas (NaN o infinito).")
+
+    mins = points.min(axis=0)
+    maxs = points.max(axis=0)
+
+    # Miniatura ya redimensionada: img/miniaturas/<hash>_100x100.png. El
+    # nombre sale del contenido de la imagen, así que dos imágenes con el
+    # mismo nombre en carpetas distintas no se pisan, y las copias de una
+    # misma imagen comparten miniatura
+    img_path = resolve_asset(base_dir, 'img', ruta_img)
+    ruta_miniatura = os.path.join(
+        THUMBNAIL_DIR,
+        f"{asset_store.content_hash(img_path)}_{THUMBNAIL_SIZE[0]}x{THUMBNAIL_SIZE[1]}.png"
+    )
+    destino = os.path.join(base_dir, 'img', ruta_miniatura)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    with Image.open(img_path) as img:
+        thumbnail = img.convert('RGBA').resize(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        # Se escribe aparte y se renombra: otro proceso del pool puede
+        # estar generando la misma miniatura al mismo tiempo
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        thumbnail.save(temporal, format='PNG')
+        os.replace(temporal, destino)
+
+    return {
+        'modelo_hash': asset_store.content_hash(model_path),
+        'modelo_vertices': int(len(points)),
+        'modelo_caras': int(len(cells)),
+        'modelo_min_x': float(mins[0]),
+        'modelo_min_y': float(mins[1]),
+        'modelo_min_z': float(mins[2]),
+        'modelo_max_x': float(maxs[0]),
+        'modelo_max_y': float(maxs[1]),
+        'modelo_max_z': float(maxs[2]),
+        'ruta_miniatura': ruta_miniatura,
+    }
+
+
+def preprocess_animals(animales, base_dir=None, max_workers=None):
+    """
+    Procesa en paralelo los archivos de una lista de animales
+    (diccionarios con 'ruta_modelo_3d' y 'ruta_img').
+
+    Retorna (resultados, errores): 'resultados' tiene un diccionario de
+    metadatos por animal, o None si su archivo fue rechazado.
+    """
+    base_dir = base_dir or os.getcwd()
+    resultados = [None] * len(animales)
+    errores = []
+    if not animales:
+        return resultados, errores
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(preprocess_animal, animal['ruta_modelo_3d'], animal['ruta_img'], base_dir)
+            for animal in animales
+        ]
+        for i, (animal, future) in enumerate(zip(animales, futures)):
+            try:
+                resultados[i] = future.result()
+            except Exception as e:
+                errores.append(
+                    f"  [ERROR] '{animal.get('nombre_comun')}': No se pudieron procesar sus archivos: {e}"
+                )
+    return resultados, errores
+
+
+def preprocesar_existentes(db_file=DB_FILE):
+    """
+    Calcula los metadatos de los animales que ya están en la base de datos
+    y aún no los tienen (p. ej. los creados por create_db.py).
+    """
+    conn = sqlite3.connect(db_file)
+    try:
+        ensure_asset_columns(conn)
+        conn.row_factory = sqlite3.Row
+        pendientes = [dict(row) for row in conn.execute(
+            "SELECT id, nombre_comun, ruta_modelo_3d, ruta_img FROM animales "
+            "WHERE modelo_caras IS NULL OR modelo_hash IS NULL"
+        ).fetchall()]
+        print(f"Procesando archivos de {len(pendientes)} animales...")
+
+        resultados, errores = preprocess_animals(pendientes)
+        for error in errores:
+            print(error)
+
+        asignaciones = ', '.join(f"{column} = :{column}" for column in ASSET_COLUMNS)
+        for animal, metadatos in zip(pendientes, resultados):
+            if metadatos:
+                conn.execute(
+                    f"UPDATE animales SET {asignaciones} WHERE id = :id",
+                    dict(metadatos, id=animal['id'])
+                )
+        conn.commit()
+        print(f"Listo: {sum(1 for r in resultados if r)} animales actualizados.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    preprocesar_existentes()
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import threading
+
+_READ_CHUNK = 1024 * 1024
+
+
+def hash_file(path):
+    """
+    Lee y hashea un archivo. Devuelve su firma (mtime_ns, tamaño, hash);
+    sirve en otro proceso, para luego pasarla a AssetStore.remember.
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(_READ_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return stat.st_mtime_ns, stat.st_size, digest.hexdigest()
+
+
+class AssetStore:
+    """
+    Identifica los archivos de img/ y models/ por el hash de su contenido.
+
+    Las cachés de miniaturas y mallas usan ese hash como clave en lugar de
+    la ruta o el ID del animal: si varias filas (o varias rutas) apuntan
+    al mismo contenido, se decodifica una sola vez y todas comparten la
+    misma instancia en memoria.
+
+    El hash de cada ruta se recuerda junto con su (mtime, tamaño); solo se
+    vuelve a leer el archivo cuando cambia.
+    """
+    def __init__(self):
+        self._hashes = {}  # ruta absoluta -> (mtime_ns, tamaño, hash)
+        self._lock = threading.Lock()
+
+    def content_hash(self, path):
+        """Hash (hex) del contenido de 'path'. Lanza OSError si no existe."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            known = self._hashes.get(path)
+        if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+
+        signature = hash_file(path)
+        with self._lock:
+            self._hashes[path] = signature
+        return signature[2]
+
+    def known_hash(self, path):
+        """
+        Hash de 'path' si ya se calculó y el archivo no cambió, o None.
+        Solo hace un stat (nunca lee el archivo), así que sirve en el hilo
+        de Tk aunque el archivo sea enorme.
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            known = self._hashes.get(path)
+        if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+        return None
+
+    def remember(self, path, signature):
+        """Guarda la firma de 'path' calculada con hash_file (p. ej. en otro proceso)."""
+        with self._lock:
+            self._hashes[os.path.abspath(path)] = tuple(signature)
+        return signature[2]
+
+    def forget(self, path):
+        """
+        Olvida el hash de 'path' (p. ej. porque el archivo cambió o se
+        borró). Devuelve el hash anterior si ninguna otra ruta conocida lo
+        comparte (sus datos en caché ya no los usa nadie), o None.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            known = self._hashes.pop(path, None)
+            if known is None:
+                return None
+            if any(other[2] == known[2] for other in self._hashes.values()):
+                return None
+        return known[2]
+
+    def unique_count(self):
+        """Número de contenidos distintos entre las rutas conocidas."""
+        with self._lock:
+            return len({known[2] for known in self._hashes.values()})
+
+
+# Instancia global compartida por las cachés de miniaturas y mallas
+asset_store = AssetStore()
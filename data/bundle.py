@@ -0,0 +1,226 @@
+"""
+Paquete de catálogo en un solo archivo, para distribuir a los kioscos.
+
+Contenido (con un índice de offsets al final):
+    - catálogo: la base de datos SQLite serializada (ya con su resumen
+      por estado e índice de búsqueda),
+    - atlas de miniaturas: una sola imagen RGBA con todas las miniaturas
+      apiladas verticalmente (cada una ocupa un bloque contiguo),
+    - mallas: cada modelo en el formato binario compacto de mesh_loader.
+
+Las imágenes y modelos con el mismo contenido (aunque tengan otra ruta)
+se guardan una sola vez; el índice recuerda el hash de cada ruta.
+
+Al abrirse se mapea con mmap: las miniaturas y mallas se leen por offset
+sin copiar datos.
+
+Uso:
+    python data/bundle.py build -o catalogo.bundle
+    python main.py --bundle catalogo.bundle
+"""
+import argparse
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+
+BUNDLE_MAGIC = b'ABND'
+BUNDLE_VERSION = 1
+# magic, versión, offset del índice, longitud del índice
+_BUNDLE_HEADER = struct.Struct('<4sIQQ')
+_ALIGNMENT = 16
+
+THUMBNAIL_SIZE = (100, 100)
+DB_FILE = os.path.join(os.getcwd(), 'data', 'animales.db')
+BUNDLE_FILE = os.path.join(os.getcwd(), 'catalogo.bundle')
+
+
+class BundleError(ValueError):
+    """El archivo no es un paquete de catálogo válido."""
+
+
+class CatalogBundle:
+    """Lector de un paquete de catálogo mapeado en memoria."""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise BundleError(f"El paquete está vacío: {path}")
+        self._view = memoryview(self._mm)
+
+        magic, version, index_offset, index_length = _BUNDLE_HEADER.unpack_from(self._mm, 0)
+        if magic != BUNDLE_MAGIC:
+            self.close()
+            raise BundleError(f"No es un paquete de catálogo: {path}")
+        if version != BUNDLE_VERSION:
+            self.close()
+            raise BundleError(f"Versión de paquete no soportada: {version}")
+        self.index = json.loads(bytes(self._view[index_offset:index_offset + index_length]))
+
+    def _section(self, offset, length):
+        return self._view[offset:offset + length]
+
+    def catalog_bytes(self):
+        """La base de datos SQLite serializada (para Connection.deserialize)."""
+        return self._section(*self.index['catalog'])
+
+    def content_hash(self, ruta):
+        """Hash del contenido de una imagen o modelo (o la ruta, en paquetes viejos)."""
+        return self.index.get('content_hashes', {}).get(ruta, ruta)
+
+    def has_thumbnail(self, ruta_img):
+        return ruta_img in self.index['thumbnails']
+
+    def thumbnail_pixels(self, ruta_img):
+        """Píxeles RGBA de la miniatura (vista sobre el mmap, sin copiar)."""
+        atlas = self.index['atlas']
+        tile = self.index['thumbnails'][ruta_img]
+        tile_bytes = atlas['tile_width'] * atlas['tile_height'] * 4
+        return self._section(atlas['offset'] + tile * tile_bytes, tile_bytes)
+
+    def thumbnail_image(self, ruta_img):
+        """Miniatura como imagen de Pillow construida sobre el mmap."""
+        from PIL import Image
+        atlas = self.index['atlas']
+        return Image.frombuffer(
+            'RGBA', (atlas['tile_width'], atlas['tile_height']),
+            self.thumbnail_pixels(ruta_img), 'raw', 'RGBA', 0, 1
+        )
+
+    def has_mesh(self, ruta_modelo_3d):
+        return ruta_modelo_3d in self.index['meshes']
+
+    def mesh(self, ruta_modelo_3d):
+        """(points, cells) como arreglos de numpy sobre el mmap, sin copiar."""
+        from data.mesh_loader import mesh_from_bytes
+        return mesh_from_bytes(self._section(*self.index['meshes'][ruta_modelo_3d]))
+
+    def close(self):
+        # Las vistas deben liberarse antes de cerrar el mmap
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        if getattr(self, '_mm', None) is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # aún hay arreglos de numpy usando el mmap
+            self._mm = None
+        self._file.close()
+
+
+def build_bundle(db_file=DB_FILE, output=BUNDLE_FILE, base_dir=None):
+    """Genera el paquete a partir de la DB y las carpetas img/ y models/."""
+    # Dependencias pesadas solo al construir
+    import numpy as np
+    from PIL import Image
+    from data.app_controller import ensure_summary_schema
+    from data.asset_store import asset_store
+    from data.asset_preprocess import resolve_asset
+    from data.mesh_loader import parse_mesh, mesh_to_bytes
+    from data.search_index import ensure_search_index
+
+    base_dir = base_dir or os.getcwd()
+
+    # 1. Catálogo: copia en memoria de la DB con sus índices listos
+    source = sqlite3.connect(db_file)
+    catalog = sqlite3.connect(':memory:')
+    source.backup(catalog)
+    source.close()
+    ensure_summary_schema(catalog)
+    ensure_search_index(catalog)
+    rutas = catalog.execute(
+        "SELECT DISTINCT ruta_img, ruta_modelo_3d FROM animales"
+    ).fetchall()
+    catalog_data = catalog.serialize()
+    catalog.close()
+
+    with open(output, 'wb') as out:
+        out.write(b'\0' * _BUNDLE_HEADER.size)
+
+        def write_section(data):
+            padding = -out.tell() % _ALIGNMENT
+            out.write(b'\0' * padding)
+            offset = out.tell()
+            out.write(data)
+            return [offset, len(data)]
+
+        index = {'catalog': write_section(catalog_data)}
+        content_hashes = {}
+
+        # 2. Atlas de miniaturas (una por contenido distinto)
+        thumbnails = {}
+        tiles = []
+        tile_by_hash = {}
+        for ruta_img in sorted({ruta for ruta, _ in rutas if ruta}):
+            try:
+                path = resolve_asset(base_dir, 'img', ruta_img)
+                content_hash = asset_store.content_hash(path)
+                if content_hash not in tile_by_hash:
+                    with Image.open(path) as img:
+                        tile = img.convert('RGBA').resize(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+                    tile_by_hash[content_hash] = len(tiles)
+                    tiles.append(np.asarray(tile))
+                thumbnails[ruta_img] = tile_by_hash[content_hash]
+                content_hashes[ruta_img] = content_hash
+            except Exception as e:
+                print(f"  Aviso: se omite la imagen '{ruta_img}': {e}")
+        atlas = np.concatenate(tiles) if tiles else np.zeros((0, THUMBNAIL_SIZE[0], 4), np.uint8)
+        offset, length = write_section(atlas.tobytes())
+        index['atlas'] = {
+            'offset': offset, 'length': length,
+            'tile_width': THUMBNAIL_SIZE[0], 'tile_height': THUMBNAIL_SIZE[1],
+        }
+        index['thumbnails'] = thumbnails
+
+        # 3. Mallas (una por contenido distinto)
+        meshes = {}
+        section_by_hash = {}
+        for ruta_modelo in sorted({ruta for _, ruta in rutas if ruta}):
+            try:
+                path = resolve_asset(base_dir, 'models', ruta_modelo)
+                content_hash = asset_store.content_hash(path)
+                if content_hash not in section_by_hash:
+                    points, cells = parse_mesh(path)
+                    section_by_hash[content_hash] = write_section(mesh_to_bytes(points, cells))
+                meshes[ruta_modelo] = section_by_hash[content_hash]
+                content_hashes[ruta_modelo] = content_hash
+            except Exception as e:
+                print(f"  Aviso: se omite el modelo '{ruta_modelo}': {e}")
+        index['meshes'] = meshes
+        index['content_hashes'] = content_hashes
+
+        # 4. Índice y cabecera
+        index_offset, index_length = write_section(json.dumps(index).encode('utf-8'))
+        out.seek(0)
+        out.write(_BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, index_offset, index_length))
+
+    print(f"Paquete creado en '{output}': {len(tiles)} miniaturas y {len(section_by_hash)} mallas "
+          f"distintas ({len(thumbnails)} imágenes y {len(meshes)} modelos referenciados).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paquete de catálogo en un solo archivo.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Generar el paquete")
+    build.add_argument('--db', default=DB_FILE, help="Ruta a animales.db")
+    build.add_argument('--output', '-o', default=BUNDLE_FILE)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if not os.path.exists(args.db):
+            print(f"Error: No se encontró la base de datos '{args.db}'.")
+            return 1
+        build_bundle(args.db, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    # Permite importar 'data.*' aunque se ejecute como 'python data/bundle.py'
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import os
+
+IMG_DIR = os.path.join(os.getcwd(), 'img')
+MODELS_DIR = os.path.join(os.getcwd(), 'models')
+
+
+class ChangeSet:
+    """Lo que cambió desde la revisión anterior."""
+    def __init__(self):
+        self.added_ids = set()
+        self.removed_ids = set()
+        self.modified_ids = set()
+        self.changed_files = set()  # rutas absolutas creadas, borradas o modificadas
+
+    @property
+    def rows_changed(self):
+        return bool(self.added_ids or self.removed_ids or self.modified_ids)
+
+    def __bool__(self):
+        return self.rows_changed or bool(self.changed_files)
+
+    def __repr__(self):
+        return (f"ChangeSet(added={len(self.added_ids)}, removed={len(self.removed_ids)}, "
+                f"modified={len(self.modified_ids)}, files={len(self.changed_files)})")
+
+
+class ChangeTracker:
+    """
+    Detecta cambios en la base de datos y en las carpetas de archivos
+    sin reiniciar la aplicación.
+
+    - Base de datos: 'PRAGMA data_version' cambia cuando otra conexión
+      (p. ej. add_animal_db.py) hace commit. Solo entonces se compara una
+      firma por fila de 'animales' para saber qué IDs cambiaron.
+    - Archivos: un índice de (mtime, tamaño) por archivo de img/ y models/.
+    """
+    def __init__(self, conn, asset_dirs=(IMG_DIR, MODELS_DIR)):
+        self.conn = conn
+        self.asset_dirs = [os.path.abspath(path) for path in asset_dirs]
+        self._data_version = self._read_data_version()
+        self._row_signatures = self._snapshot_rows()
+        self._file_index = self._snapshot_files()
+
+    def check(self):
+        """Devuelve un ChangeSet con lo que cambió desde la última llamada."""
+        changes = ChangeSet()
+
+        data_version = self._read_data_version()
+        if data_version != self._data_version:
+            self._data_version = data_version
+            rows = self._snapshot_rows()
+            old_rows = self._row_signatures
+            changes.added_ids = rows.keys() - old_rows.keys()
+            changes.removed_ids = old_rows.keys() - rows.keys()
+            changes.modified_ids = {
+                animal_id for animal_id in rows.keys() & old_rows.keys()
+                if rows[animal_id] != old_rows[animal_id]
+            }
+            self._row_signatures = rows
+
+        files = self._snapshot_files()
+        old_files = self._file_index
+        changes.changed_files = {
+            path for path in files.keys() | old_files.keys()
+            if files.get(path) != old_files.get(path)
+        }
+        self._file_index = files
+        return changes
+
+    def _read_data_version(self):
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        return cursor.execute("PRAGMA data_version").fetchone()[0]
+
+    def _snapshot_rows(self):
+        """Firma (hash de todas las columnas) de cada animal, por ID."""
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute("SELECT * FROM animales")
+        signatures = {}
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            for row in rows:
+                signatures[row[0]] = hash(row)
+        return signatures
+
+    def _snapshot_files(self):
+        """Índice ruta -> (mtime_ns, tamaño) de las carpetas de archivos."""
+        index = {}
+        pending = [path for path in self.asset_dirs if os.path.isdir(path)]
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            index[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError as e:
+                print(f"No se pudo revisar la carpeta {directory}: {e}")
+        return index
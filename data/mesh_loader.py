@@ -0,0 +1,189 @@
+import struct
+import threading
+
+import numpy as np
+import meshio
+
+from data.asset_store import asset_store, hash_file
+from data.mesh_picking import MeshIndex
+from data.resource_manager import resource_manager
+
+# Caché de mallas ya parseadas y de sus índices espaciales, por el hash
+# del contenido del archivo (varias rutas o filas con el mismo .obj
+# comparten una sola instancia):
+#   ('mesh', hash) -> (points, cells)
+#   ('mesh_index', hash) -> MeshIndex
+_mesh_cache = {}
+_cache_lock = threading.Lock()
+
+
+# Formato binario compacto: cabecera + float32 (N, 3) + uint32 (M, 3)
+MESH_MAGIC = b'AMSH'
+_MESH_HEADER = struct.Struct('<4sII')
+
+
+class UnsupportedMeshError(ValueError):
+    """El archivo no contiene caras que se puedan triangular."""
+
+
+def triangulate(mesh):
+    """
+    Convierte todas las caras poligonales del mesh en triángulos
+    (abanico desde el primer vértice de cada cara).
+    Devuelve un arreglo (N, 3) de índices.
+    """
+    blocks = []
+    for block in mesh.cells:
+        data = np.asarray(block.data)
+        if data.ndim != 2 or data.shape[1] < 3:
+            continue  # líneas, vértices sueltos, etc.
+        n = data.shape[1]
+        for i in range(1, n - 1):
+            blocks.append(data[:, [0, i, i + 1]])
+
+    if not blocks:
+        raise UnsupportedMeshError("El modelo .obj no tiene una malla compatible.")
+    return np.vstack(blocks)
+
+
+def parse_mesh(filepath):
+    """
+    Lee un .obj y devuelve (points, cells) sin pasar por la caché.
+    """
+    mesh = meshio.read(filepath)
+    points = np.ascontiguousarray(mesh.points[:, :3])
+    cells = triangulate(mesh)
+    return points, cells
+
+
+def parse_mesh_with_signature(filepath):
+    """
+    Como parse_mesh, pero también devuelve la firma del archivo
+    (mtime_ns, tamaño, hash) para pasarla a cache_mesh. Pensada para
+    correr en otro proceso: así el hilo de Tk nunca lee el .obj completo.
+    """
+    signature = hash_file(filepath)
+    points, cells = parse_mesh(filepath)
+    return points, cells, signature
+
+
+def mesh_to_bytes(points, cells):
+    """Serializa la malla en el formato binario compacto."""
+    points = np.ascontiguousarray(points, dtype='<f4')
+    cells = np.ascontiguousarray(cells, dtype='<u4')
+    header = _MESH_HEADER.pack(MESH_MAGIC, len(points), len(cells))
+    return header + points.tobytes() + cells.tobytes()
+
+
+def mesh_from_bytes(buffer):
+    """
+    Lee una malla en formato binario compacto. Los arreglos devueltos son
+    vistas sobre 'buffer' (no se copian los datos).
+    """
+    magic, n_points, n_cells = _MESH_HEADER.unpack_from(buffer, 0)
+    if magic != MESH_MAGIC:
+        raise UnsupportedMeshError("El archivo no está en el formato binario de mallas.")
+    offset = _MESH_HEADER.size
+    points = np.frombuffer(buffer, dtype='<f4', count=n_points * 3, offset=offset)
+    offset += points.nbytes
+    cells = np.frombuffer(buffer, dtype='<u4', count=n_cells * 3, offset=offset)
+    return points.reshape(n_points, 3), cells.reshape(n_cells, 3)
+
+
+def cached_mesh(filepath):
+    """
+    (points, cells) de 'filepath' si ya está en caché, o None. No lee el
+    archivo: si su hash todavía no se conoce, se considera que no está.
+    """
+    content_hash = asset_store.known_hash(filepath)
+    if content_hash is None:
+        return None
+    return _cached(('mesh', content_hash))
+
+
+def cache_mesh(filepath, points, cells, signature=None):
+    """
+    Guarda una malla ya parseada (p. ej. en otro proceso) en la caché y
+    la registra en el gestor de memoria. 'signature' es la firma que
+    devolvió parse_mesh_with_signature; sin ella se hashea el archivo aquí.
+    """
+    if signature is not None:
+        content_hash = asset_store.remember(filepath, signature)
+    else:
+        content_hash = asset_store.content_hash(filepath)
+    key = ('mesh', content_hash)
+    mesh = (points, cells)
+    _store(key, mesh, 'mesh', points.nbytes + cells.nbytes)
+    return mesh
+
+
+def load_mesh(filepath):
+    """
+    Devuelve (points, cells) para 'filepath', usando la caché si ya se
+    parseó antes. Cada malla se registra en el gestor de memoria.
+    """
+    cached = _cached(('mesh', asset_store.content_hash(filepath)))
+    if cached is not None:
+        return cached
+    return cache_mesh(filepath, *parse_mesh(filepath))
+
+
+def _index_key(source):
+    """
+    'source' identifica la malla: la ruta del .obj (la misma que se pasó
+    a load_mesh) o 'bundle:<hash>' (el hash del contenido de la malla en
+    el paquete) para las mallas de un paquete.
+    """
+    if source.startswith('bundle:'):
+        return ('mesh_index', source)
+    return ('mesh_index', asset_store.content_hash(source))
+
+
+def cached_mesh_index(source):
+    """Índice espacial (MeshIndex) de la malla si ya está en caché, o None."""
+    return _cached(_index_key(source))
+
+
+def cache_mesh_index(source, index):
+    """Guarda un índice espacial ya construido junto a su malla."""
+    _store(_index_key(source), index, 'mesh_index', index.nbytes)
+    return index
+
+
+def load_mesh_index(source, points, cells):
+    """
+    Devuelve el índice espacial (MeshIndex) de una malla, construyéndolo
+    solo la primera vez.
+    """
+    cached = cached_mesh_index(source)
+    if cached is not None:
+        return cached
+    return cache_mesh_index(source, MeshIndex(points, cells))
+
+
+def _cached(key):
+    with _cache_lock:
+        cached = _mesh_cache.get(key)
+    if cached is not None:
+        resource_manager.touch(key)
+    return cached
+
+
+def _store(key, value, owner, size_bytes):
+    with _cache_lock:
+        _mesh_cache[key] = value
+    # Las mallas son tuplas (points, cells): se sigue el arreglo de vértices
+    obj = value[0] if isinstance(value, tuple) else value
+    resource_manager.register(owner, key, size_bytes, lambda: _evict(key), obj=obj)
+
+
+def evict_content(content_hash):
+    """Libera la malla y el índice en caché de un contenido."""
+    for key in (('mesh', content_hash), ('mesh_index', content_hash)):
+        _evict(key)
+        resource_manager.unregister(key)
+
+
+def _evict(key):
+    with _cache_lock:
+        _mesh_cache.pop(key, None)
@@ -0,0 +1,184 @@
+import math
+
+import numpy as np
+
+# Triángulos promedio por celda de la cuadrícula (resolución del índice)
+TRIANGLES_PER_CELL = 4
+MAX_CELLS_PER_AXIS = 256
+# Triángulos procesados a la vez al construir (limita la memoria temporal)
+BUILD_CHUNK = 1_000_000
+# Triángulos candidatos que se acumulan antes de probarlos contra el rayo
+RAYCAST_BATCH = 256
+
+
+class MeshIndex:
+    """
+    Índice espacial de una malla triangulada para seleccionar puntos con
+    el ratón: una cuadrícula uniforme donde cada celda guarda los
+    triángulos cuya caja envolvente la toca.
+
+    Se construye una sola vez por malla (vectorizado con numpy) y cada
+    consulta recorre solo las celdas que atraviesa el rayo, de adelante
+    hacia atrás, hasta el primer triángulo que intersecta.
+    """
+    def __init__(self, points, cells):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.cells = np.asarray(cells)
+        self.mins = self.points.min(axis=0)
+        self.maxs = self.points.max(axis=0)
+
+        # Resolución: proporcional al tamaño de cada eje y con unos
+        # TRIANGLES_PER_CELL triángulos por celda en promedio
+        extent = np.maximum(self.maxs - self.mins, 1e-9)
+        target_cells = max(1, len(self.cells) // TRIANGLES_PER_CELL)
+        scale = (target_cells / np.prod(extent)) ** (1.0 / 3.0)
+        self.shape = np.clip(np.ceil(extent * scale), 1, MAX_CELLS_PER_AXIS).astype(np.int64)
+        self.cell_size = extent / self.shape
+        self._build_grid()
+
+    @property
+    def nbytes(self):
+        """Memoria propia del índice (sin contar la malla)."""
+        return self._cell_start.nbytes + self._cell_triangles.nbytes
+
+    def _cell_coords(self, positions):
+        coords = np.floor((positions - self.mins) / self.cell_size).astype(np.int64)
+        return np.clip(coords, 0, self.shape - 1)
+
+    def _build_grid(self):
+        """Tabla celda -> triángulos en formato CSR (inicio por celda + lista)."""
+        all_cells, all_triangles = [], []
+        for first in range(0, len(self.cells), BUILD_CHUNK):
+            chunk = self.cells[first:first + BUILD_CHUNK]
+            corners = [self.points[chunk[:, i]] for i in range(3)]
+            lo = self._cell_coords(np.minimum(np.minimum(corners[0], corners[1]), corners[2]))
+            hi = self._cell_coords(np.maximum(np.maximum(corners[0], corners[1]), corners[2]))
+            span = hi - lo + 1
+            counts = span.prod(axis=1)
+
+            # Una entrada por cada (triángulo, celda) que toca su caja
+            local_ids = np.repeat(np.arange(len(chunk)), counts)
+            k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            span_x = span[local_ids, 0]
+            span_y = span[local_ids, 1]
+            cx = lo[local_ids, 0] + k % span_x
+            cy = lo[local_ids, 1] + (k // span_x) % span_y
+            cz = lo[local_ids, 2] + k // (span_x * span_y)
+            all_cells.append(((cz * self.shape[1] + cy) * self.shape[0] + cx).astype(np.int32))
+            all_triangles.append((local_ids + first).astype(np.int32))
+
+        cell_ids = np.concatenate(all_cells)
+        order = np.argsort(cell_ids, kind='stable')
+        self._cell_triangles = np.concatenate(all_triangles)[order]
+        per_cell = np.bincount(cell_ids, minlength=int(self.shape.prod()))
+        self._cell_start = np.concatenate(([0], np.cumsum(per_cell)))
+
+    def _intersect(self, triangle_ids, origin, direction):
+        """Möller-Trumbore vectorizado: (t, u, v) de cada triángulo, t=inf si falla."""
+        triangles = self.cells[triangle_ids]
+        v0 = self.points[triangles[:, 0]]
+        edge1 = self.points[triangles[:, 1]] - v0
+        edge2 = self.points[triangles[:, 2]] - v0
+        p = np.cross(direction, edge2)
+        det = np.einsum('ij,ij->i', edge1, p)
+        valid = np.abs(det) > 1e-12
+        inv_det = np.where(valid, 1.0 / np.where(valid, det, 1.0), 0.0)
+        s = origin - v0
+        u = np.einsum('ij,ij->i', s, p) * inv_det
+        q = np.cross(s, edge1)
+        v = (q @ direction) * inv_det
+        t = np.einsum('ij,ij->i', edge2, q) * inv_det
+        # Pequeña tolerancia para no perder rayos que pasan justo por una
+        # arista o un vértice compartido
+        eps = 1e-9
+        hit = valid & (u >= -eps) & (v >= -eps) & (u + v <= 1 + eps) & (t >= 0)
+        return np.where(hit, t, np.inf), u, v
+
+    def raycast(self, origin, direction):
+        """
+        Primer triángulo que cruza el rayo origin + t * direction (t >= 0).
+        Devuelve (triángulo, punto, índice del vértice más cercano) o None.
+        """
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        norm = np.linalg.norm(direction)
+        if norm == 0:
+            return None
+        direction = direction / norm
+
+        # Tramo del rayo dentro de la caja de la malla (método de "slabs")
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t1 = (self.mins - origin) / direction
+            t2 = (self.maxs - origin) / direction
+        t1 = np.where(direction == 0, -np.inf, t1)
+        t2 = np.where(direction == 0, np.inf, t2)
+        inside = (direction != 0) | ((origin >= self.mins) & (origin <= self.maxs))
+        if not inside.all():
+            return None
+        t_enter = max(np.minimum(t1, t2).max(), 0.0)
+        t_exit = np.maximum(t1, t2).min()
+        if t_enter > t_exit:
+            return None
+
+        # Recorrido de celdas (Amanatides-Woo) en escalares de Python
+        start = origin + direction * t_enter
+        cell = [int(c) for c in self._cell_coords(start[np.newaxis])[0]]
+        shape = [int(n) for n in self.shape]
+        step, t_next, t_delta = [], [], []
+        for axis in range(3):
+            d = float(direction[axis])
+            size = float(self.cell_size[axis])
+            if d > 0:
+                boundary = self.mins[axis] + (cell[axis] + 1) * size
+                step.append(1)
+                t_next.append(float(boundary - origin[axis]) / d)
+                t_delta.append(size / d)
+            elif d < 0:
+                boundary = self.mins[axis] + cell[axis] * size
+                step.append(-1)
+                t_next.append(float(boundary - origin[axis]) / d)
+                t_delta.append(-size / d)
+            else:
+                step.append(0)
+                t_next.append(math.inf)
+                t_delta.append(math.inf)
+
+        # Las celdas se prueban por lotes (una sola llamada de numpy por
+        # lote); un impacto solo vale si cae antes de la última celda del
+        # lote: las siguientes podrían tener un triángulo más cercano
+        cell_start = self._cell_start
+        nx, ny = shape[0], shape[1]
+        batch = []
+        batch_size = 0
+        while True:
+            t_leave = min(t_next)
+            cell_id = (cell[2] * ny + cell[1]) * nx + cell[0]
+            begin, end = cell_start[cell_id], cell_start[cell_id + 1]
+            if begin != end:
+                batch.append(self._cell_triangles[begin:end])
+                batch_size += end - begin
+
+            axis = t_next.index(t_leave)
+            cell[axis] += step[axis]
+            finished = t_leave > t_exit or not 0 <= cell[axis] < shape[axis]
+            if batch and (finished or batch_size >= RAYCAST_BATCH):
+                hit = self._closest_hit(batch, origin, direction, t_leave)
+                if hit is not None:
+                    return hit
+                batch = []
+                batch_size = 0
+            if finished:
+                return None
+            t_next[axis] += t_delta[axis]
+
+    def _closest_hit(self, batch, origin, direction, t_limit):
+        candidates = np.concatenate(batch) if len(batch) > 1 else batch[0]
+        t, u, v = self._intersect(candidates, origin, direction)
+        best = int(np.argmin(t))
+        if t[best] > t_limit + 1e-9 * (1.0 + abs(t_limit)):
+            return None
+        triangle = int(candidates[best])
+        point = origin + direction * t[best]
+        weights = (1.0 - u[best] - v[best], u[best], v[best])
+        vertex = int(self.cells[triangle][int(np.argmax(weights))])
+        return triangle, point, vertex
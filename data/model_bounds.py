@@ -0,0 +1,30 @@
+import numpy as np
+
+
+def stored_bounds(metadata, content_hash):
+    """
+    Caja envolvente guardada en la DB: (mins, maxs), o None si falta o si
+    se calculó para otro contenido del .obj (el archivo se reemplazó).
+    'content_hash' es el hash de la malla que se va a dibujar.
+    """
+    if not metadata or content_hash is None or metadata.get('modelo_hash') != content_hash:
+        return None
+    mins = [metadata.get(f'modelo_min_{axis}') for axis in 'xyz']
+    maxs = [metadata.get(f'modelo_max_{axis}') for axis in 'xyz']
+    if None in mins or None in maxs:
+        return None
+    return mins, maxs
+
+
+def set_axes_limits(ax, mins, maxs):
+    """Fija ejes cúbicos alrededor de la caja envolvente (mins, maxs)."""
+    max_range = np.array([maxs[0]-mins[0], maxs[1]-mins[1], maxs[2]-mins[2]]).max() / 2.0
+    if max_range == 0: max_range = 1.0 # Evitar división por cero si es un punto
+
+    mid_x = (maxs[0]+mins[0]) * 0.5
+    mid_y = (maxs[1]+mins[1]) * 0.5
+    mid_z = (maxs[2]+mins[2]) * 0.5
+
+    ax.set_xlim(mid_x - max_range, mid_x + max_range)
+    ax.set_ylim(mid_y - max_range, mid_y + max_range)
+    ax.set_zlim(mid_z - max_range, mid_z + max_range)
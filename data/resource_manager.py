@@ -0,0 +1,194 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+# Presupuesto total por defecto (en bytes) para imágenes, mallas y figuras.
+# Se puede cambiar con la variable de entorno MEMORY_BUDGET_MB o con
+# --memory-budget <MB> en main.py y server.py.
+MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+MEMORY_BUDGET_ENV = 'MEMORY_BUDGET_MB'
+
+
+def parse_budget_mb(text):
+    """Convierte un presupuesto en MB (texto) a bytes; ValueError si no es válido."""
+    megabytes = float(text)
+    if megabytes <= 0:
+        raise ValueError(f"el presupuesto debe ser mayor que 0 MB: {text}")
+    return int(megabytes * 1024 * 1024)
+
+
+def budget_from_env(default=MEMORY_BUDGET_BYTES):
+    """Presupuesto de la variable de entorno MEMORY_BUDGET_MB, o 'default'."""
+    text = os.environ.get(MEMORY_BUDGET_ENV)
+    if not text:
+        return default
+    try:
+        return parse_budget_mb(text)
+    except ValueError as e:
+        print(f"Aviso: {MEMORY_BUDGET_ENV} inválido ({e}); se usan {default // (1024 * 1024)} MB.")
+        return default
+
+
+class ResourceManager:
+    """
+    Gestor central de memoria.
+
+    Cada dueño de un recurso (caché de imágenes, caché de mallas, figura
+    de matplotlib...) lo registra con una clave, su tamaño en bytes y una
+    función de liberación. Cuando el total supera el presupuesto se
+    liberan los recursos menos usados recientemente (LRU). Los recursos
+    fijados (p. ej. la figura que está en pantalla) cuentan en el uso pero
+    nunca se desalojan.
+
+    Desalojar solo suelta la referencia de la caché: si otra parte de la
+    interfaz (las tarjetas de CardGrid, un panel) sigue usando el objeto,
+    la memoria no se libera todavía. Para que usage() lo refleje, el
+    dueño puede pasar el objeto en register(); tras desalojarlo se sigue
+    con una referencia débil y se cuenta como 'retenido' mientras viva.
+    """
+    def __init__(self, budget_bytes=None):
+        self.budget_bytes = budget_from_env() if budget_bytes is None else budget_bytes
+        # clave -> (dueño, tamaño, función de liberación, referencia débil o None)
+        self._entries = OrderedDict()
+        self._pinned = set()
+        # (dueño, tamaño, referencia débil) de lo desalojado que aún vive
+        self._retained = []
+        self._total_bytes = 0
+        self._evictions = 0
+        self._lock = threading.RLock()
+
+    def register(self, owner, key, size_bytes, release, pinned=False, obj=None):
+        """
+        Registra (o actualiza) un recurso y lo marca como el más reciente.
+        'release' se llama sin argumentos si el recurso es desalojado.
+        Con 'pinned' queda fijado hasta unpin() o unregister().
+        'obj' (opcional) es el objeto en caché, para saber si sigue vivo
+        después de desalojarlo.
+        """
+        try:
+            ref = weakref.ref(obj) if obj is not None else None
+        except TypeError:
+            ref = None  # p. ej. tuplas: no admiten referencias débiles
+        with self._lock:
+            if ref is not None:
+                # Si el objeto vuelve a la caché deja de contarse como retenido
+                self._retained = [item for item in self._retained if item[2]() is not obj]
+            if pinned:
+                self._pinned.add(key)
+            else:
+                self._pinned.discard(key)
+            if key in self._entries:
+                self._total_bytes -= self._entries[key][1]
+            self._entries[key] = (owner, int(size_bytes), release, ref)
+            self._entries.move_to_end(key)
+            self._total_bytes += int(size_bytes)
+            victims = self._collect_victims(keep=key)
+        self._release_all(victims)
+
+    def touch(self, key):
+        """Marca un recurso como usado recientemente."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def pin(self, key):
+        """Impide que un recurso se desaloje (p. ej. mientras está en pantalla)."""
+        with self._lock:
+            if key in self._entries:
+                self._pinned.add(key)
+
+    def unpin(self, key):
+        """Vuelve a permitir que un recurso se desaloje."""
+        with self._lock:
+            if key not in self._pinned:
+                return
+            self._pinned.discard(key)
+            victims = self._collect_victims()
+        self._release_all(victims)
+
+    def unregister(self, key):
+        """Olvida un recurso que su dueño ya liberó por su cuenta."""
+        with self._lock:
+            self._pinned.discard(key)
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._total_bytes -= entry[1]
+
+    def set_budget(self, budget_bytes):
+        """Cambia el presupuesto y desaloja lo que sobre."""
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            victims = self._collect_victims()
+        self._release_all(victims)
+
+    def usage(self):
+        """
+        Devuelve un diccionario con el uso actual, útil para monitoreo.
+        'retained_bytes' es lo desalojado que todavía está en uso fuera de
+        la caché (no cuenta en 'total_bytes' pero sigue ocupando memoria).
+        """
+        with self._lock:
+            by_owner = {}
+            for owner, size, _, _ in self._entries.values():
+                stats = by_owner.setdefault(owner, {'count': 0, 'bytes': 0})
+                stats['count'] += 1
+                stats['bytes'] += size
+            self._retained = [item for item in self._retained if item[2]() is not None]
+            for owner, size, _ in self._retained:
+                stats = by_owner.setdefault(owner, {'count': 0, 'bytes': 0})
+                stats['retained_bytes'] = stats.get('retained_bytes', 0) + size
+            return {
+                'total_bytes': self._total_bytes,
+                'budget_bytes': self.budget_bytes,
+                'retained_bytes': sum(size for _, size, _ in self._retained),
+                'entries': len(self._entries),
+                'pinned': len(self._pinned),
+                'evictions': self._evictions,
+                'owners': by_owner,
+            }
+
+    def report(self):
+        """Resumen de usage() en una línea, para la consola."""
+        usage = self.usage()
+        mb = 1024 * 1024
+        owners = ', '.join(
+            f"{owner} {stats['bytes'] / mb:.1f} MB ({stats['count']})"
+            for owner, stats in sorted(usage['owners'].items())
+        )
+        return (
+            f"Memoria en caché: {usage['total_bytes'] / mb:.1f} de "
+            f"{usage['budget_bytes'] / mb:.0f} MB"
+            + (f" [{owners}]" if owners else "")
+            + f"; {usage['evictions']} desalojos, "
+            f"{usage['retained_bytes'] / mb:.1f} MB desalojados aún en uso."
+        )
+
+    def _collect_victims(self, keep=None):
+        """Saca entradas en orden LRU hasta respetar el presupuesto."""
+        victims = []
+        for key in list(self._entries):
+            if self._total_bytes <= self.budget_bytes:
+                break
+            if key == keep or key in self._pinned:
+                continue
+            owner, size, release, ref = self._entries.pop(key)
+            self._total_bytes -= size
+            self._evictions += 1
+            if ref is not None:
+                self._retained.append((owner, size, ref))
+            victims.append((key, release))
+        return victims
+
+    def _release_all(self, victims):
+        # Las funciones de liberación se llaman fuera del lock para que
+        # puedan volver a llamar a unregister() sin problemas.
+        for key, release in victims:
+            try:
+                release()
+            except Exception as e:
+                print(f"Error liberando el recurso {key}: {e}")
+
+
+# Instancia compartida por toda la aplicación
+resource_manager = ResourceManager()
@@ -0,0 +1,459 @@
+import math
+import re
+import unicodedata
+
+# Fracción mínima de los trigramas de la búsqueda que debe tener un animal
+# para considerarse una coincidencia aproximada (con errores de dedo). Solo
+# se usan si ningún animal contiene todas las palabras de la búsqueda.
+SIMILARITY_THRESHOLD = 0.5
+# Las búsquedas más cortas que esto (en trigramas) solo aceptan subcadenas.
+FUZZY_MIN_TRIGRAMS = 3
+# Con listas de trigramas más largas que esto (en total), una página de
+# búsqueda recorre los animales en orden en lugar de reunir primero
+# todas las coincidencias
+INDEX_WALK_MIN_POSTINGS = 100_000
+# Tope al contar cada lista de trigramas para buscar la más corta
+EXACT_PROBE_POSTINGS = 1_000
+# Animales sin indexar a partir de los cuales se reconstruye el índice
+# secundario de trigramas en lugar de actualizarlo
+BULK_REINDEX_ROWS = 10_000
+# Animales por lote (y por commit) al construir el índice
+INDEX_BATCH_ROWS = 5_000
+
+# Índice de búsqueda: texto normalizado por animal y listas de trigramas
+_SEARCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS busqueda_animales (
+    animal_id INTEGER PRIMARY KEY REFERENCES animales(id),
+    texto TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS trigramas (
+    trigrama TEXT NOT NULL,
+    animal_id INTEGER NOT NULL,
+    PRIMARY KEY (trigrama, animal_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_trigramas_animal ON trigramas(animal_id);
+
+-- Los triggers no pueden normalizar el texto, así que solo sacan del
+-- índice a los animales modificados o borrados (desde cualquier conexión
+-- o herramienta); ensure_search_index los vuelve a indexar como nuevos.
+CREATE TRIGGER IF NOT EXISTS trg_busqueda_animales_update
+AFTER UPDATE OF nombre_comun, nombre_cientifico, estado_id ON animales
+WHEN OLD.nombre_comun IS NOT NEW.nombre_comun
+  OR OLD.nombre_cientifico IS NOT NEW.nombre_cientifico
+  OR OLD.estado_id IS NOT NEW.estado_id
+BEGIN
+    DELETE FROM trigramas WHERE animal_id = OLD.id;
+    DELETE FROM busqueda_animales WHERE animal_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_busqueda_animales_delete AFTER DELETE ON animales
+BEGIN
+    DELETE FROM trigramas WHERE animal_id = OLD.id;
+    DELETE FROM busqueda_animales WHERE animal_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_busqueda_estados_update
+AFTER UPDATE OF nombre ON estados
+WHEN OLD.nombre IS NOT NEW.nombre
+BEGIN
+    DELETE FROM trigramas
+    WHERE animal_id IN (SELECT id FROM animales WHERE estado_id = OLD.id);
+    DELETE FROM busqueda_animales
+    WHERE animal_id IN (SELECT id FROM animales WHERE estado_id = OLD.id);
+END;
+"""
+
+
+def fold(text):
+    """
+    Normaliza un texto para buscar: sin acentos, en minúsculas y con
+    cualquier puntuación convertida en un solo espacio.
+    'Michoacán de Ocampo' -> 'michoacan de ocampo'
+    """
+    text = text or ''
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(re.findall(r'\w+', text.casefold()))
+
+
+def document_trigrams(folded_text):
+    """
+    Trigramas de un texto ya normalizado. Cada palabra se rellena con
+    espacios para que el inicio y el fin de palabra también cuenten.
+    """
+    grams = set()
+    for word in folded_text.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+def query_trigrams(folded_query):
+    """
+    Trigramas de la búsqueda. Devuelve (internos, inicio_de_palabra):
+    los internos van sin relleno, así que una subcadena en medio de una
+    palabra los tiene todos; los de inicio de palabra solo suman
+    puntaje para las búsquedas aproximadas.
+    """
+    inner = set()
+    leading = set()
+    for word in folded_query.split():
+        if len(word) < 3:
+            continue
+        leading.update((f"  {word[0]}", f" {word[:2]}"))
+        for i in range(len(word) - 2):
+            inner.add(word[i:i + 3])
+    return inner, leading
+
+
+def _search_text(nombre_comun, nombre_cientifico, estado):
+    return fold(' '.join(filter(None, [nombre_comun, nombre_cientifico, estado])))
+
+
+def index_animal(cursor, animal_id, nombre_comun, nombre_cientifico, estado):
+    """
+    (Re)indexa un animal. Se llama al insertar o modificar un animal;
+    no hace commit.
+    """
+    texto = _search_text(nombre_comun, nombre_cientifico, estado)
+    cursor.execute("DELETE FROM trigramas WHERE animal_id = ?", (animal_id,))
+    cursor.execute(
+        "INSERT OR REPLACE INTO busqueda_animales (animal_id, texto) VALUES (?, ?)",
+        (animal_id, texto)
+    )
+    cursor.executemany(
+        "INSERT INTO trigramas (trigrama, animal_id) VALUES (?, ?)",
+        [(gram, animal_id) for gram in document_trigrams(texto)]
+    )
+
+
+def ensure_search_index(conn, batch_size=INDEX_BATCH_ROWS):
+    """
+    Crea las tablas del índice si no existen e indexa solo los animales
+    que aún no están (p. ej. insertados por otra herramienta, o sacados
+    del índice por los triggers al modificarlos). También quita del
+    índice los animales que ya no existen.
+
+    Si el índice ya está al día no se escribe nada (no queda ninguna
+    transacción abierta que bloquee a otros procesos). Los animales que
+    faltan se indexan en lotes de 'batch_size', en orden de ID y con un
+    commit por lote: la memoria no crece con el tamaño del catálogo y, si
+    se interrumpe, la siguiente llamada sigue donde se quedó.
+    """
+    conn.executescript(_SEARCH_SCHEMA)
+    cursor = conn.cursor()
+    cursor.row_factory = None  # tuplas, aunque la conexión use diccionarios
+    cursor.execute("""
+        SELECT EXISTS (
+            SELECT 1 FROM busqueda_animales
+            WHERE animal_id NOT IN (SELECT id FROM animales)
+        )
+    """)
+    has_orphans = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT COUNT(*) FROM animales a
+        WHERE NOT EXISTS (SELECT 1 FROM busqueda_animales b WHERE b.animal_id = a.id)
+    """)
+    missing = cursor.fetchone()[0]
+    if not missing and not has_orphans:
+        return
+
+    orphans = 0
+    if has_orphans:
+        with conn:
+            cursor.execute("""
+                DELETE FROM busqueda_animales
+                WHERE animal_id NOT IN (SELECT id FROM animales)
+            """)
+            orphans = cursor.rowcount
+            cursor.execute("""
+                DELETE FROM trigramas
+                WHERE animal_id NOT IN (SELECT animal_id FROM busqueda_animales)
+            """)
+
+    # En cargas grandes es más rápido rehacer el índice por animal al
+    # final que mantenerlo fila por fila. Si la carga se interrumpe, el
+    # esquema lo vuelve a crear en la siguiente llamada.
+    rebuild = missing >= BULK_REINDEX_ROWS
+    if rebuild:
+        with conn:
+            cursor.execute("DROP INDEX IF EXISTS idx_trigramas_animal")
+
+    indexed = 0
+    last_id = -2 ** 63
+    while True:
+        # Los animales que faltan no tienen trigramas (los huérfanos ya se
+        # quitaron). Cada lote se vuelve a consultar desde el último ID en
+        # lugar de mantener un cursor abierto sobre las tablas que se
+        # están escribiendo.
+        cursor.execute("""
+            SELECT a.id, a.nombre_comun, a.nombre_cientifico, e.nombre
+            FROM animales a
+            JOIN estados e ON a.estado_id = e.id
+            WHERE a.id > ?
+              AND NOT EXISTS (SELECT 1 FROM busqueda_animales b WHERE b.animal_id = a.id)
+            ORDER BY a.id
+            LIMIT ?
+        """, (last_id, batch_size))
+        batch = [(row[0], _search_text(*row[1:])) for row in cursor.fetchall()]
+        if not batch:
+            break
+        with conn:
+            cursor.executemany(
+                "INSERT INTO busqueda_animales (animal_id, texto) VALUES (?, ?)",
+                batch
+            )
+            cursor.executemany(
+                "INSERT OR IGNORE INTO trigramas (trigrama, animal_id) VALUES (?, ?)",
+                sorted((gram, animal_id) for animal_id, texto in batch for gram in document_trigrams(texto))
+            )
+        last_id = batch[-1][0]
+        indexed += len(batch)
+
+    if rebuild:
+        with conn:
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_trigramas_animal ON trigramas(animal_id)")
+    print(f"Índice de búsqueda actualizado ({indexed} nuevos, {orphans} eliminados).")
+
+
+def _like_escape(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _words_like(words, column='texto'):
+    """(condición, params) que exige cada palabra como subcadena de 'column'."""
+    words = list(dict.fromkeys(words))
+    sql = ' AND '.join([f"{column} LIKE ? ESCAPE '\\'"] * len(words))
+    return sql, [f"%{_like_escape(word)}%" for word in words]
+
+
+def _trigram_terms(folded):
+    """
+    (trigramas, internos, mínimo_compartidos) de la búsqueda, o None si es
+    muy corta para usar trigramas.
+    """
+    inner, leading = query_trigrams(folded)
+    if not inner:
+        return None
+
+    grams = sorted(inner | leading)
+    if len(inner) >= FUZZY_MIN_TRIGRAMS:
+        required = max(1, math.ceil(len(grams) * SIMILARITY_THRESHOLD))
+    else:
+        required = len(grams) + 1  # imposible: solo subcadenas
+    return grams, sorted(inner), required
+
+
+def has_exact_match(conn, search_term):
+    """
+    True si algún animal contiene cada palabra de la búsqueda como
+    subcadena. Solo entonces se descartan las coincidencias aproximadas:
+    'animal de sonora' no debe traer animales de todos los estados por
+    compartir 'animal'.
+    """
+    folded = fold(search_term)
+    terms = _trigram_terms(folded)
+    if terms is None:
+        return True  # sin trigramas solo se buscan subcadenas
+
+    cursor = conn.cursor()
+    cursor.row_factory = None  # tuplas, aunque la conexión use diccionarios
+    # Se revisa la lista de trigramas más corta (con tope en el conteo):
+    # los errores de dedo suelen dejar una lista vacía o casi vacía
+    counts = []
+    for gram in terms[1]:
+        cursor.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM trigramas WHERE trigrama = ? LIMIT ?)",
+            (gram, EXACT_PROBE_POSTINGS)
+        )
+        counts.append((cursor.fetchone()[0], gram))
+    rarest = min(counts)[1]
+
+    likes, params = _words_like(folded.split(), 'b.texto')
+    cursor.execute(f"""
+        SELECT EXISTS (
+            SELECT 1 FROM trigramas t
+            JOIN busqueda_animales b ON b.animal_id = t.animal_id
+            WHERE t.trigrama = ? AND {likes}
+        )
+    """, [rarest] + params)
+    return bool(cursor.fetchone()[0])
+
+
+def _trigram_query(folded, fuzzy=True):
+    """
+    Prepara la consulta sobre las listas de trigramas. Devuelve
+    (sql, params, total_de_trigramas) o None si la búsqueda es muy corta;
+    la consulta da (animal_id, compartidos, texto) por coincidencia.
+
+    Sin 'fuzzy' un animal coincide si contiene cada palabra de la búsqueda
+    como subcadena. Con 'fuzzy', en búsquedas suficientemente largas basta
+    con SIMILARITY_THRESHOLD de los trigramas (tolera errores de dedo).
+    """
+    terms = _trigram_terms(folded)
+    if terms is None:
+        return None
+
+    grams, inner, required = terms
+    having = f"SUM(trigrama IN ({', '.join('?' * len(inner))})) >= ?"
+    params = grams + inner + [len(inner)]
+    if fuzzy:
+        having += " OR compartidos >= ?"
+        params.append(required)
+
+    # Las palabras cortas (p. ej. '15' en 'species 15') no tienen
+    # trigramas internos; se exigen siempre como subcadena del texto. Sin
+    # errores de dedo se exigen así todas las palabras.
+    words = folded.split() if not fuzzy else [word for word in folded.split() if len(word) < 3]
+    where = ""
+    if words:
+        likes, like_params = _words_like(words, 'b.texto')
+        where = f"WHERE {likes}"
+        params += like_params
+
+    sql = f"""
+        SELECT m.animal_id, m.compartidos, b.texto
+        FROM (
+            SELECT animal_id, COUNT(*) AS compartidos
+            FROM trigramas
+            WHERE trigrama IN ({', '.join('?' * len(grams))})
+            GROUP BY animal_id
+            HAVING {having}
+        ) m
+        JOIN busqueda_animales b ON b.animal_id = m.animal_id
+        {where}
+    """
+    return sql, params, len(grams)
+
+
+def match_condition(search_term, id_column='a.id', fuzzy=True):
+    """
+    Devuelve (sql, params) con una condición que filtra 'id_column' a los
+    animales que coinciden con la búsqueda, o None si no hay búsqueda.
+
+    Con 3 letras o más se cruzan las listas de trigramas; con menos, se
+    busca la subcadena en el texto normalizado. 'fuzzy' acepta también
+    coincidencias aproximadas (ver has_exact_match).
+    """
+    folded = fold(search_term)
+    if not folded:
+        return None
+
+    query = _trigram_query(folded, fuzzy)
+    if query is None:
+        return (
+            f"{id_column} IN (SELECT animal_id FROM busqueda_animales "
+            f"WHERE texto LIKE ? ESCAPE '\\')",
+            [f"%{_like_escape(folded)}%"]
+        )
+
+    sql, params, _ = query
+    return f"{id_column} IN (SELECT animal_id FROM ({sql}))", params
+
+
+def correlated_match_condition(search_term, id_column='a.id', fuzzy=True):
+    """
+    Igual que match_condition, pero la condición se evalúa fila por fila
+    con subconsultas correlacionadas por 'id_column' (búsquedas por llave
+    primaria). Sirve para recorrer un índice ya ordenado y cortar con
+    LIMIT en cuanto hay suficientes coincidencias, en lugar de calcular
+    y ordenar primero todas.
+    """
+    folded = fold(search_term)
+    if not folded:
+        return None
+
+    def like(words):
+        likes, params = _words_like(words)
+        return (
+            f"EXISTS (SELECT 1 FROM busqueda_animales "
+            f"WHERE animal_id = {id_column} AND {likes})"
+        ), params
+
+    terms = _trigram_terms(folded)
+    if terms is None:
+        return like([folded])
+    if not fuzzy:
+        return like(folded.split())
+
+    grams, inner, required = terms
+    conditions = [f"""(
+        SELECT SUM(trigrama IN ({', '.join('?' * len(inner))})) >= ? OR COUNT(*) >= ?
+        FROM trigramas
+        WHERE animal_id = {id_column} AND trigrama IN ({', '.join('?' * len(grams))})
+    )"""]
+    params = inner + [len(inner), required] + grams
+
+    short_words = [word for word in folded.split() if len(word) < 3]
+    if short_words:
+        sql, like_params = like(short_words)
+        conditions.append(sql)
+        params += like_params
+    return ' AND '.join(conditions), params
+
+
+def prefers_index_walk(conn, search_term, min_postings=INDEX_WALK_MIN_POSTINGS):
+    """
+    Decide cómo paginar una búsqueda. True: recorrer los animales en orden
+    revisando cada uno (correlated_match_condition); conviene con listas
+    de trigramas largas, porque hay muchas coincidencias y la página se
+    llena pronto. False: reunir primero las coincidencias
+    (match_condition); conviene con listas cortas, donde el recorrido
+    vería casi toda la tabla. Las búsquedas sin trigramas siempre recorren.
+    """
+    terms = _trigram_terms(fold(search_term))
+    if terms is None:
+        return True
+
+    cursor = conn.cursor()
+    cursor.row_factory = None  # tuplas, aunque la conexión use diccionarios
+    total = 0
+    for gram in terms[0]:
+        # Conteo con tope: no hace falta recorrer listas enormes completas
+        cursor.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM trigramas WHERE trigrama = ? LIMIT ?)",
+            (gram, min_postings - total)
+        )
+        total += cursor.fetchone()[0]
+        if total >= min_postings:
+            return True
+    return False
+
+
+def rank(conn, search_term, limit=50):
+    """
+    Devuelve [(animal_id, puntaje)] ordenado de mejor a peor coincidencia.
+    El puntaje es la fracción de trigramas de la búsqueda que tiene el
+    animal; los que contienen la búsqueda completa van primero y, a igual
+    puntaje, los de texto más corto.
+    """
+    folded = fold(search_term)
+    if not folded:
+        return []
+
+    cursor = conn.cursor()
+    cursor.row_factory = None  # tuplas, aunque la conexión use diccionarios
+
+    fuzzy = not has_exact_match(conn, search_term)
+    query = _trigram_query(folded, fuzzy)
+    if query is None:
+        condition, params = match_condition(search_term, 'animal_id')
+        cursor.execute(
+            f"SELECT animal_id FROM busqueda_animales WHERE {condition} LIMIT ?",
+            params + [limit]
+        )
+        return [(row[0], 1.0) for row in cursor.fetchall()]
+
+    # El orden se resuelve en SQL: solo salen 'limit' filas de SQLite
+    sql, params, total = query
+    cursor.execute(f"""
+        SELECT animal_id, compartidos
+        FROM ({sql})
+        ORDER BY instr(texto, ?) = 0, compartidos DESC, length(texto), animal_id
+        LIMIT ?
+    """, params + [folded, limit])
+    return [(animal_id, shared / total) for animal_id, shared in cursor.fetchall()]
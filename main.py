@@ -1,10 +1,12 @@
-import tkinter as tk
 import os
+import sys
 import subprocess # Para llamar al script de creación de DB
 
-# Importar las clases de los otros archivos
+# Importar las clases de los otros archivos. La vista (Tk, matplotlib) se
+# importa dentro de main(): los procesos de render y de mallas usan
+# 'spawn' y vuelven a importar este módulo, y así no cargan la interfaz.
 from data.app_controller import AppController
-from ui.main_view import MainView # Asumiendo que tu archivo se llama main_view.py
+from data.resource_manager import parse_budget_mb, resource_manager
 
 
 data_path = os.path.join(os.getcwd(), 'data')
@@ -39,27 +41,76 @@ def main():
     """
     Función principal de la aplicación.
     """
-    # 1. Asegurarse de que la DB exista
-    setup_database()
+    # 1. Asegurarse de que la DB exista (o usar un paquete de catálogo:
+    #    python main.py --bundle catalogo.bundle)
+    bundle = None
+    if '--bundle' in sys.argv:
+        from data.bundle import CatalogBundle
+        position = sys.argv.index('--bundle') + 1
+        if position >= len(sys.argv):
+            print("Uso: python main.py --bundle <archivo.bundle>")
+            return
+        bundle_path = sys.argv[position]
+        try:
+            bundle = CatalogBundle(bundle_path)
+        except (OSError, ValueError) as e:
+            print(f"Error al abrir el paquete '{bundle_path}': {e}")
+            return
+    else:
+        setup_database()
+
+    # Presupuesto de memoria para imágenes, mallas y figuras:
+    # python main.py --memory-budget 512 (en MB; también MEMORY_BUDGET_MB)
+    if '--memory-budget' in sys.argv:
+        position = sys.argv.index('--memory-budget') + 1
+        try:
+            resource_manager.set_budget(parse_budget_mb(sys.argv[position]))
+        except (IndexError, ValueError):
+            print("Uso: python main.py --memory-budget <MB>")
+            if bundle:
+                bundle.close()
+            return
+    print(f"Presupuesto de memoria: {resource_manager.budget_bytes / (1024 * 1024):.0f} MB")
     
     # 2. Inicializar el Controlador
     #    (El controlador se conecta a la DB)
     try:
-        controller = AppController(DB_FILE)
+        controller = AppController(DB_FILE, bundle=bundle)
     except Exception as e:
         print(f"Error fatal al inicializar el controlador: {e}")
+        if bundle:
+            bundle.close()
         return
 
     # 3. Inicializar la Vista Principal
     #    (La vista recibe el controlador para funcionar)
-    app = MainView(controller)
+    from ui.main_view import MainView
+    #    (python main.py --render-process carga y dibuja los modelos 3D
+    #    en un proceso aparte)
+    app = MainView(controller, render_in_process='--render-process' in sys.argv)
     
     # 4. Darle al controlador una referencia a la vista
     #    (Esto es opcional pero bueno para la comunicación bidireccional)
     controller.set_view(app)
     
-    # 5. Iniciar el bucle de la aplicación
-    app.mainloop()
+    # 5. (Opcional) Vigilar bloqueos del hilo principal: python main.py --watchdog
+    watchdog = None
+    if '--watchdog' in sys.argv:
+        from ui.stall_watchdog import StallWatchdog
+        watchdog = StallWatchdog(app)
+        watchdog.start()
+
+    # 6. Iniciar el bucle de la aplicación
+    try:
+        app.mainloop()
+    finally:
+        if watchdog:
+            watchdog.stop() # Escribe el reporte de bloqueos
+        if app.render_process:
+            app.render_process.close()
+        if bundle:
+            bundle.close()
+        print(resource_manager.report())
 
 if __name__ == '__main__':
     # Asegúrate de tener las dependencias:
@@ -0,0 +1,407 @@
+"""
+Servidor HTTP local (asyncio) que comparte un solo catálogo entre varios
+kioscos o un front end web.
+
+Rutas (solo GET/HEAD):
+    /api/states                      -> lista de estados
+    /api/states/<nombre>/animals     -> animales de un estado (por páginas)
+    /api/search?q=<término>          -> búsqueda (por páginas, igual que la barra lateral)
+    /api/animals/<id>                -> detalle de un animal
+    /thumbnails/<id>?size=100        -> miniatura PNG
+    /meshes/<id>                     -> malla en formato binario compacto
+    /meshes/<id>?format=obj          -> archivo .obj original
+    /api/memory                      -> uso del gestor de memoria (cachés)
+
+Las rutas por páginas aceptan ?limit=<n> y ?cursor=<cursor> y responden
+{"animals": [...], "next_cursor": "..."}; 'next_cursor' es null en la
+última página.
+
+Uso:
+    python server.py --port 8080 --memory-budget 512
+"""
+import argparse
+import asyncio
+import email.utils
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from data.app_controller import AppController, DB_PATH, ensure_summary_schema
+from data.asset_store import asset_store
+from data.resource_manager import parse_budget_mb, resource_manager
+from data.search_index import ensure_search_index
+
+IMG_DIR = os.path.join(os.getcwd(), 'img')
+MODELS_DIR = os.path.join(os.getcwd(), 'models')
+
+KEEPALIVE_TIMEOUT = 15  # segundos de espera entre peticiones
+MAX_HEADER_LINES = 100
+THUMBNAIL_SIZE_RANGE = (16, 512)
+PAGE_SIZE = 50  # animales por página si no se pide 'limit'
+MAX_PAGE_SIZE = 500
+
+STATUS_TEXT = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or STATUS_TEXT[status])
+        self.status = status
+
+
+class Response:
+    """Respuesta ya lista para enviar, con sus validadores de caché."""
+    def __init__(self, body, content_type, etag=None, mtime=None, status=200):
+        self.body = body
+        self.content_type = content_type
+        self.etag = etag or '"%s"' % hashlib.sha1(body).hexdigest()
+        self.mtime = mtime
+        self.status = status
+
+
+class CatalogServer:
+    def __init__(self, db_path=DB_PATH, workers=None):
+        self.db_path = db_path
+        # Las migraciones (resumen por estado, índice de búsqueda) corren
+        # aquí; los hilos del pool solo leen. Esta conexión se queda
+        # abierta para poner al día el índice de búsqueda si otro proceso
+        # cambia la base (ver _refresh_search_index).
+        self._index_conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._index_lock = threading.Lock()
+        ensure_summary_schema(self._index_conn)
+        ensure_search_index(self._index_conn)
+        self._data_version = self._data_version_now()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='catalog')
+        # Cada hilo del pool tiene su propia conexión de solo lectura
+        self._local = threading.local()
+        # Respuestas de archivos ya procesadas (miniaturas y mallas)
+        self._asset_cache = {}
+
+        self.routes = [
+            (re.compile(r'^/api/states$'), self._states),
+            (re.compile(r'^/api/states/(?P<name>[^/]+)/animals$'), self._state_animals),
+            (re.compile(r'^/api/search$'), self._search),
+            (re.compile(r'^/api/animals/(?P<animal_id>\d+)$'), self._animal),
+            (re.compile(r'^/thumbnails/(?P<animal_id>\d+)$'), self._thumbnail),
+            (re.compile(r'^/meshes/(?P<animal_id>\d+)$'), self._mesh),
+            (re.compile(r'^/api/memory$'), self._memory),
+        ]
+
+    # --- Conexiones ---
+
+    async def handle_client(self, reader, writer):
+        """Atiende una conexión (con keep-alive) hasta que el cliente la cierre."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Línea más larga que el límite del StreamReader
+                    await self._send(writer, 'GET', self._error(400, "Línea de petición demasiado larga."),
+                                     keep_alive=False)
+                    break
+                if not request_line:
+                    break
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._send(writer, 'GET', self._error(400), keep_alive=False)
+                    break
+
+                try:
+                    headers = await self._read_headers(reader)
+                except HTTPError as e:
+                    await self._send(writer, method, self._error(e.status, str(e)), keep_alive=False)
+                    break
+                keep_alive = (
+                    version == 'HTTP/1.1'
+                    and headers.get('connection', '').lower() != 'close'
+                )
+
+                response = await self._dispatch(method, target, headers)
+                await self._send(writer, method, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_headers(self, reader):
+        """Lee las cabeceras; HTTPError(431) si son demasiadas o muy largas."""
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            try:
+                line = await reader.readline()
+            except (ValueError, asyncio.LimitOverrunError):
+                raise HTTPError(431, "Cabecera demasiado larga.")
+            if line in (b'\r\n', b'\n', b''):
+                return headers
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        raise HTTPError(431, f"Más de {MAX_HEADER_LINES} cabeceras.")
+
+    async def _send(self, writer, method, response, keep_alive):
+        lines = [
+            f"HTTP/1.1 {response.status} {STATUS_TEXT[response.status]}",
+            f"Content-Type: {response.content_type}",
+            f"Content-Length: {len(response.body)}",
+            f"ETag: {response.etag}",
+            "Cache-Control: no-cache",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if response.mtime is not None:
+            lines.append(f"Last-Modified: {email.utils.formatdate(response.mtime, usegmt=True)}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        if method != 'HEAD':
+            writer.write(response.body)
+        await writer.drain()
+
+    async def _dispatch(self, method, target, headers):
+        if method not in ('GET', 'HEAD'):
+            return self._error(405)
+
+        url = urlsplit(target)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        for pattern, handler in self.routes:
+            match = pattern.match(url.path)
+            if not match:
+                continue
+            params = {k: unquote(v) for k, v in match.groupdict().items()}
+            try:
+                # Las consultas y el procesamiento de archivos van al pool
+                loop = asyncio.get_running_loop()
+                response = await loop.run_in_executor(
+                    self.executor, lambda: handler(query, **params)
+                )
+            except HTTPError as e:
+                return self._error(e.status, str(e))
+            except Exception as e:
+                print(f"Error atendiendo {target}: {e}")
+                return self._error(500)
+            return self._check_not_modified(response, headers)
+        return self._error(404)
+
+    def _check_not_modified(self, response, headers):
+        """
+        Devuelve un 304 si el cliente ya tiene esa versión. La respuesta
+        original no se modifica porque puede estar en caché.
+        """
+        not_modified = Response(b'', response.content_type, etag=response.etag,
+                                mtime=response.mtime, status=304)
+
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return not_modified if response.etag in tags or '*' in tags else response
+
+        if_modified_since = headers.get('if-modified-since')
+        if if_modified_since and response.mtime is not None:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return response
+            if int(response.mtime) <= since:
+                return not_modified
+        return response
+
+    def _error(self, status, message=None):
+        body = json.dumps({'error': message or STATUS_TEXT[status]}).encode('utf-8')
+        return Response(body, 'application/json; charset=utf-8', status=status)
+
+    # --- Manejadores (corren en los hilos del pool) ---
+
+    def _controller(self):
+        controller = getattr(self._local, 'controller', None)
+        if controller is None:
+            controller = AppController(self.db_path, read_only=True)
+            self._local.controller = controller
+        return controller
+
+    def _json(self, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        return Response(body, 'application/json; charset=utf-8',
+                        mtime=os.path.getmtime(self.db_path))
+
+    def _page(self, query, load_page):
+        """Página de animales según 'limit' y 'cursor' de la query string."""
+        try:
+            limit = int(query.get('limit', PAGE_SIZE))
+        except ValueError:
+            raise HTTPError(400, "El parámetro 'limit' debe ser un entero.")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        try:
+            animals, next_cursor = load_page(page_size=limit, cursor=query.get('cursor'))
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        return self._json({'animals': animals, 'next_cursor': next_cursor})
+
+    def _states(self, query):
+        return self._json(self._controller().load_initial_states())
+
+    def _state_animals(self, query, name):
+        controller = self._controller()
+        if name not in controller.load_initial_states():
+            raise HTTPError(404, f"Estado no encontrado: {name}")
+        return self._page(
+            query, lambda **page: controller.load_animals_by_state_page(name, **page)
+        )
+
+    def _data_version_now(self):
+        # Cambia cada vez que otra conexión hace commit en la base
+        return self._index_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _refresh_search_index(self):
+        """
+        Si otro proceso escribió en la base desde la última búsqueda,
+        indexa los animales nuevos o modificados antes de buscar.
+        """
+        with self._index_lock:
+            version = self._data_version_now()
+            if version == self._data_version:
+                return
+            try:
+                ensure_search_index(self._index_conn)
+            except sqlite3.Error as e:
+                # p. ej. la base está bloqueada: se reintenta en la siguiente búsqueda
+                print(f"Error al actualizar el índice de búsqueda: {e}")
+                return
+            self._data_version = version
+
+    def _search(self, query):
+        self._refresh_search_index()
+        controller = self._controller()
+        term = query.get('q', '')
+        return self._page(query, lambda **page: controller.get_filtered_page(term, **page))
+
+    def _animal(self, query, animal_id):
+        animal = self._controller().get_animal(int(animal_id))
+        if animal is None:
+            raise HTTPError(404, f"Animal no encontrado: {animal_id}")
+        return self._json(animal)
+
+    def _memory(self, query):
+        # Sin 'mtime': el uso cambia aunque la base no cambie
+        body = json.dumps(resource_manager.usage()).encode('utf-8')
+        return Response(body, 'application/json; charset=utf-8')
+
+    def _asset_path(self, animal_id, column, folder):
+        animal = self._controller().get_animal(int(animal_id))
+        if animal is None or not animal.get(column):
+            raise HTTPError(404, f"Animal no encontrado: {animal_id}")
+        path = os.path.join(folder, animal[column])
+        if not os.path.exists(path):
+            raise HTTPError(404, f"No se encontró el archivo: {animal[column]}")
+        return path
+
+    def _cached_asset(self, path, variant, build):
+        """
+        Devuelve la respuesta de un archivo procesado, reutilizándola
+        mientras el archivo no cambie. La clave es el hash del contenido:
+        los animales que comparten archivo comparten también la respuesta.
+        La caché respeta el presupuesto del gestor de memoria.
+        """
+        stat = os.stat(path)
+        content_hash = asset_store.content_hash(path)
+        key = ('http', content_hash, variant)
+        response = self._asset_cache.get(key)
+        if response is not None:
+            resource_manager.touch(key)
+            return response
+
+        body, content_type = build()
+        etag = '"%s-%s"' % (content_hash, variant)
+        response = Response(body, content_type, etag=etag, mtime=stat.st_mtime)
+        self._asset_cache[key] = response
+        resource_manager.register(
+            'http', key, len(body), lambda: self._asset_cache.pop(key, None)
+        )
+        return response
+
+    def _thumbnail(self, query, animal_id):
+        path = self._asset_path(animal_id, 'ruta_img', IMG_DIR)
+        try:
+            size = int(query.get('size', 100))
+        except ValueError:
+            raise HTTPError(400, "El parámetro 'size' debe ser un entero.")
+        size = max(THUMBNAIL_SIZE_RANGE[0], min(size, THUMBNAIL_SIZE_RANGE[1]))
+
+        def build():
+            from PIL import Image
+            with Image.open(path) as img:
+                img = img.convert('RGBA').resize((size, size), Image.Resampling.LANCZOS)
+                buffer = io.BytesIO()
+                img.save(buffer, format='PNG')
+            return buffer.getvalue(), 'image/png'
+
+        return self._cached_asset(path, f'thumb{size}', build)
+
+    def _mesh(self, query, animal_id):
+        path = self._asset_path(animal_id, 'ruta_modelo_3d', MODELS_DIR)
+
+        if query.get('format') == 'obj':
+            def build():
+                with open(path, 'rb') as f:
+                    return f.read(), 'text/plain; charset=utf-8'
+            return self._cached_asset(path, 'obj', build)
+
+        def build():
+            from data.mesh_loader import load_mesh, mesh_to_bytes
+            points, cells = load_mesh(path)
+            return mesh_to_bytes(points, cells), 'application/octet-stream'
+
+        return self._cached_asset(path, 'bin', build)
+
+
+async def serve(host, port, db_path, workers):
+    catalog = CatalogServer(db_path, workers)
+    server = await asyncio.start_server(catalog.handle_client, host, port, backlog=1024)
+    print(f"Sirviendo el catálogo en http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP local del catálogo.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--db', default=DB_PATH, help="Ruta a animales.db")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Hilos para consultas y archivos (por defecto, según los CPUs)")
+    parser.add_argument('--memory-budget', type=parse_budget_mb, default=None, metavar='MB',
+                        help="Memoria para la caché de miniaturas y mallas, en MB "
+                             "(por defecto MEMORY_BUDGET_MB o 256)")
+    args = parser.parse_args()
+    if args.memory_budget is not None:
+        resource_manager.set_budget(args.memory_budget)
+
+    if not os.path.exists(args.db):
+        print(f"Error: No se encontró la base de datos '{args.db}'.")
+        return
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.db, args.workers))
+    except KeyboardInterrupt:
+        print("Servidor detenido.")
+        print(resource_manager.report())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,34 @@
 import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
+import bisect
+import math
 import os
+import time
+from collections import deque
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np # Necesario para el panel 3D
 
 # --- Importaciones para 3D ---
-try:
-    import meshio
-except ImportError:
-    print("Error: Se requiere la biblioteca 'meshio'.")
-    print("Por favor, instálala con: pip install meshio")
-    exit()
-
+# (meshio solo lo usa data/mesh_loader; la proyección '3d' de matplotlib
+# se registra sola, sin importar Axes3D)
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import (
     FigureCanvasTkAgg, NavigationToolbar2Tk
 )
-from mpl_toolkits.mplot3d import Axes3D
+
+from data.asset_preprocess import preprocess_animal
+from data.change_tracker import ChangeSet, ChangeTracker
+from data.mesh_loader import (
+    load_mesh, parse_mesh_with_signature, cached_mesh, cache_mesh, cached_mesh_index, cache_mesh_index,
+    evict_content as evict_mesh_content, UnsupportedMeshError
+)
+from data.asset_store import asset_store
+from data.mesh_picking import MeshIndex
+from data.model_bounds import stored_bounds, set_axes_limits
+from data.resource_manager import resource_manager
+from ui.render_process import RenderProcess
 
 # --- ---
 
@@ -99,73 +111,290 @@ class ScrollableFrame(ttk.Frame):
         widget.bind("<Button-5>", self._on_mouse_wheel)   # Linux (scroll down)
 
 
-# --- Componente Reutilizable: AnimalCard ---
+# --- Construcción incremental de widgets ---
 
-class AnimalCard(ttk.Frame):
+class IncrementalBuilder:
     """
-    Una tarjeta individual que muestra la info de un animal.
+    Ejecuta generadores que construyen widgets en trozos sobre el bucle
+    de Tk. Cada 'yield' del generador marca un punto donde se puede
+    pausar; en cada trozo se trabaja como máximo 'frame_budget_ms' y
+    luego se le devuelve el control a Tk para que repinte y atienda
+    la entrada del usuario.
     """
-    # --- MODIFICACIÓN: Recibe 'main_view' en lugar de 'detail_panel' ---
-    def __init__(self, parent, controller, animal_data, main_view, *args, **kwargs):
-        super().__init__(parent, *args, **kwargs)
-        self.controller = controller
-        self.animal_data = animal_data
-        self.main_view = main_view  # <-- Guardar referencia a MainView
-        
-        self.animal_image = self._load_animal_image()
+    def __init__(self, widget, frame_budget_ms=12):
+        self.widget = widget
+        self.frame_budget_ms = frame_budget_ms
+        self._queue = deque()
+        self._after_id = None
+        self._unbounded_steps = 0
+
+    def start(self, generator, first_batch=0):
+        """
+        Cancela lo pendiente y empieza a construir con 'generator'.
+        Los primeros 'first_batch' pasos (la primera pantalla) se hacen
+        sin límite de tiempo para que aparezcan de golpe.
+        """
+        self.cancel()
+        self._unbounded_steps = first_batch
+        self.queue(generator)
+
+    def queue(self, generator):
+        """Añade un generador al final de la cola (p. ej. "Cargar más")."""
+        self._queue.append(generator)
+        if self._after_id is None:
+            self._after_id = self.widget.after_idle(self._step)
+
+    def cancel(self):
+        """Detiene la construcción en curso (p. ej. al cambiar la búsqueda)."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        while self._queue:
+            self._queue.popleft().close()
+        self._unbounded_steps = 0
+
+    @property
+    def busy(self):
+        return bool(self._queue)
+
+    def _step(self):
+        self._after_id = None
+        deadline = time.perf_counter() + self.frame_budget_ms / 1000.0
+
+        while self._queue:
+            if self._unbounded_steps > 0:
+                self._unbounded_steps -= 1
+            elif time.perf_counter() >= deadline:
+                break
+            try:
+                next(self._queue[0])
+            except StopIteration:
+                self._queue.popleft()
+            except Exception as e:
+                print(f"Error construyendo la lista: {e}")
+                self._queue.popleft()
 
-        self._create_widgets()
+        if self._queue:
+            # Dejar que Tk procese eventos y repinte antes del siguiente trozo
+            self._after_id = self.widget.after(1, self._step)
 
-    def _load_animal_image(self):
-        """Carga y redimensiona la imagen para esta tarjeta."""
-        try:
-            # Intentar cargar la imagen real
-            name_img = self.controller.load_img_name(self.animal_data['id'])
-            path_img_animal = os.path.join(os.getcwd(), 'img', name_img)
-            return MainView._load_image(path_img_animal, size=(100, 100))
-        except Exception as e:
-            # Fallback si el controlador o la imagen fallan (para testing)
-            print(f"Error cargando imagen real {self.animal_data.get('id')}: {e}")
+
+class BackgroundTasks:
+    """
+    Ejecuta trabajo pesado fuera del hilo de Tk (en un pool de hilos o de
+    procesos) y entrega cada resultado en el hilo de Tk: los futures se
+    revisan con 'after' cada 'poll_ms'. Así las cachés y el gestor de
+    memoria (que puede cerrar figuras al desalojar) solo se tocan desde Tk.
+    """
+    def __init__(self, widget, executor, poll_ms=30):
+        self.widget = widget
+        self.executor = executor
+        self.poll_ms = poll_ms
+        self._pending = []  # (future, on_done, on_error)
+        self._after_id = None
+
+    def submit(self, func, *args, on_done, on_error=None):
+        """
+        Ejecuta func(*args) en el pool. Al terminar se llama on_done(resultado)
+        u on_error(excepción) en el hilo de Tk.
+        """
+        future = self.executor.submit(func, *args)
+        self._pending.append((future, on_done, on_error))
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.poll_ms, self._poll)
+        return future
+
+    def cancel_all(self):
+        """Olvida los trabajos pendientes (sus resultados se descartan)."""
+        for future, _, _ in self._pending:
+            future.cancel()
+        self._pending.clear()
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _poll(self):
+        self._after_id = None
+        finished = [task for task in self._pending if task[0].done()]
+        self._pending = [task for task in self._pending if not task[0].done()]
+        for future, on_done, on_error in finished:
+            if future.cancelled():
+                continue
+            error = future.exception()
             try:
-                # Intentar cargar imagen de placeholder
-                placeholder_path = self.animal_data.get('placeholder_img')
-                if placeholder_path and os.path.exists(placeholder_path):
-                     return MainView._load_image(placeholder_path, size=(100, 100))
+                if error is None:
+                    on_done(future.result())
+                elif on_error is not None:
+                    on_error(error)
                 else:
-                    return None
-            except Exception as e2:
-                print(f"Error cargando imagen placeholder: {e2}")
-                return None
+                    print(f"Error en tarea de fondo: {error}")
+            except Exception as e:
+                print(f"Error procesando el resultado de una tarea de fondo: {e}")
+        if self._pending:
+            self._after_id = self.widget.after(self.poll_ms, self._poll)
 
-    def _create_widgets(self):
-        """Crea los widgets internos de la tarjeta."""
-        animal_button = ttk.Button(
-            self, 
-            image=self.animal_image,
-            command=self._show_details 
-        )
-        animal_button.pack(ipadx=5, ipady=5, expand=True)
 
-        nombre_comun = ttk.Label(
-            self, 
-            text=self.animal_data['nombre_comun']
+# --- Cuadrícula de tarjetas dibujada en un solo Canvas ---
+
+class CardGrid(tk.Canvas):
+    """
+    Dibuja las tarjetas de animales como elementos de un solo tk.Canvas
+    (rectángulo, imagen y dos textos por tarjeta) en lugar de crear un
+    Frame con tres widgets por animal. Las tarjetas se acomodan en filas
+    que se ajustan al ancho disponible; los clics se resuelven por las
+    etiquetas (tags) del elemento bajo el puntero. Con Ctrl+clic se marca
+    la tarjeta para comparar ('on_toggle'); 'is_selected' indica cuáles
+    se dibujan marcadas.
+    """
+    cell_size = (140, 180)  # ancho, alto de cada tarjeta con su margen
+    card_fill = '#f7f7f7'
+    card_hover_fill = '#e4e4e4'
+    selected_outline = '#2a7ab0'
+
+    def __init__(self, parent, on_select, *args, on_toggle=None, is_selected=None, **kwargs):
+        kwargs.setdefault('background', '#f7f7f7')
+        kwargs.setdefault('highlightthickness', 0)
+        kwargs.setdefault('height', 1)
+        super().__init__(parent, *args, **kwargs)
+        self.on_select = on_select
+        self.on_toggle = on_toggle
+        self.is_selected = is_selected
+        self.animals = []
+        self._images = []  # Tk necesita conservar la referencia de cada imagen
+        self._columns = 1
+
+        self.tag_bind('card', '<Button-1>', self._on_click)
+        self.tag_bind('card', '<Control-Button-1>', self._on_toggle)
+        self.tag_bind('card', '<Enter>', self._on_enter)
+        self.tag_bind('card', '<Leave>', self._on_leave)
+        self.bind('<Configure>', self._on_configure)
+
+    def add_card(self, animal_data, image=None):
+        """Dibuja una tarjeta en la siguiente celda libre."""
+        index = len(self.animals)
+        self.animals.append(animal_data)
+        self._images.append(image)
+        self._draw_card(index)
+        self._update_height()
+
+    def update_card(self, index, animal_data, image=None):
+        """Vuelve a dibujar una tarjeta existente en su misma celda."""
+        self.animals[index] = animal_data
+        self._images[index] = image
+        self.delete(f'card{index}')
+        self._draw_card(index)
+
+    def insert_card(self, index, animal_data, image=None):
+        """Inserta una tarjeta en 'index'; las siguientes avanzan una celda."""
+        self.animals.insert(index, animal_data)
+        self._images.insert(index, image)
+        self._redraw_from(index)
+
+    def remove_card(self, index):
+        """Quita una tarjeta; las siguientes retroceden una celda."""
+        del self.animals[index]
+        del self._images[index]
+        self.delete(f'card{len(self.animals)}')  # la última celda queda libre
+        self._redraw_from(index)
+
+    def _redraw_from(self, index):
+        for i in range(index, len(self.animals)):
+            self.delete(f'card{i}')
+            self._draw_card(i)
+        self._update_height()
+
+    def _draw_card(self, index):
+        animal_data = self.animals[index]
+        image = self._images[index]
+        x, y = self._cell_origin(index, self._columns)
+        cell_w, cell_h = self.cell_size
+        tags = ('card', f'card{index}')
+        selected = self.is_selected is not None and self.is_selected(animal_data)
+        self.create_rectangle(
+            x + 5, y + 5, x + cell_w - 5, y + cell_h - 5,
+            fill=self.card_fill,
+            outline=self.selected_outline if selected else '#cfcfcf',
+            width=3 if selected else 1,
+            tags=tags + ('card_bg',)
         )
-        nombre_comun.pack()
-        
-        nombre_cientifico = ttk.Label(
-            self, 
-            text=self.animal_data['nombre_cientifico']
+        if image is not None:
+            self.create_image(x + cell_w // 2, y + 12, image=image, anchor='n', tags=tags)
+        self.create_text(
+            x + cell_w // 2, y + 118, text=animal_data['nombre_comun'],
+            width=cell_w - 16, anchor='n', justify='center', tags=tags
+        )
+        self.create_text(
+            x + cell_w // 2, y + 150, text=animal_data['nombre_cientifico'],
+            width=cell_w - 16, anchor='n', justify='center',
+            font=("arial", 9, "italic"), tags=tags
         )
-        nombre_cientifico.pack()
 
-    def _show_details(self):
-        """
-        Se llama al hacer clic en la tarjeta.
-        Le dice a la MainView que cambie al panel de detalles.
-        """
-        print(f"Mostrando detalles para: {self.animal_data['nombre_comun']}")
-        # Llamar al método de MainView para cambiar de vista
-        self.main_view.show_detail_view(self.animal_data)
+    def clear(self):
+        self.delete('all')
+        self.animals.clear()
+        self._images.clear()
+        self._update_height()
+
+    def _cell_origin(self, index, columns):
+        row, col = divmod(index, columns)
+        return col * self.cell_size[0], row * self.cell_size[1]
+
+    def _columns_for_width(self, width):
+        return max(1, width // self.cell_size[0])
+
+    def _update_height(self):
+        rows = -(-len(self.animals) // self._columns)  # techo
+        height = max(1, rows * self.cell_size[1])
+        if int(self.cget('height')) != height:
+            self.configure(height=height)
+
+    def _on_configure(self, event):
+        """Reacomoda las tarjetas solo si cambia el número de columnas."""
+        columns = self._columns_for_width(event.width)
+        if columns == self._columns:
+            return
+        old_columns, self._columns = self._columns, columns
+        # Una sola pasada: mover los elementos de cada tarjeta a su nueva celda
+        for index in range(len(self.animals)):
+            old_x, old_y = self._cell_origin(index, old_columns)
+            new_x, new_y = self._cell_origin(index, columns)
+            if (old_x, old_y) != (new_x, new_y):
+                self.move(f'card{index}', new_x - old_x, new_y - old_y)
+        self._update_height()
+
+    def _card_index(self):
+        """Índice de la tarjeta bajo el puntero (por sus tags), o None."""
+        for tag in self.gettags('current'):
+            if tag.startswith('card') and tag[4:].isdigit():
+                return int(tag[4:])
+        return None
+
+    def _on_click(self, event):
+        index = self._card_index()
+        if index is not None:
+            animal_data = self.animals[index]
+            print(f"Mostrando detalles para: {animal_data['nombre_comun']}")
+            self.on_select(animal_data)
+
+    def _on_toggle(self, event):
+        index = self._card_index()
+        if index is not None and self.on_toggle is not None:
+            self.on_toggle(self.animals[index])
+            self.redraw_card(index)
+
+    def redraw_card(self, index):
+        """Vuelve a dibujar una tarjeta (p. ej. al cambiar su selección)."""
+        self.update_card(index, self.animals[index], self._images[index])
+
+    def _on_enter(self, event):
+        index = self._card_index()
+        if index is not None:
+            self.itemconfigure(f'card{index}&&card_bg', fill=self.card_hover_fill)
+            self.configure(cursor='hand2')
+
+    def _on_leave(self, event):
+        self.itemconfigure('card_bg', fill=self.card_fill)
+        self.configure(cursor='')
 
 
 # --- Clase Panel Detallado ---
@@ -173,6 +402,10 @@ class DetailPanel(ttk.Frame):
     """
     Un Frame de Tkinter que carga y muestra un archivo .obj y otros detalles.
     """
+    max_render_faces = 200_000  # Caras máximas a dibujar (nivel de detalle)
+    pick_tolerance_px = 4  # Movimiento máximo para que un clic no cuente como rotación
+    remote_rotate_deg_per_px = 0.5  # Giro al arrastrar sobre un cuadro del proceso de render
+
     # --- MODIFICACIÓN: Recibe 'main_view' ---
     def __init__(self, parent, main_view, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
@@ -181,6 +414,25 @@ class DetailPanel(ttk.Frame):
         self.figure = None
         self.canvas = None
         self.toolbar = None
+        self._figure_key = ('figure', id(self))
+        self.current_animal = None
+
+        # Selección de puntos sobre el modelo
+        self.ax = None
+        self._pick_source = None  # malla cuyo índice se está preparando
+        self._pick_index = None
+        self._pick_marker = None
+        self._press_xy = None
+        self._index_tasks = BackgroundTasks(
+            self, ThreadPoolExecutor(max_workers=1, thread_name_prefix='mesh-index')
+        )
+
+        # Visor en otro proceso (main.py --render-process): la ventana solo
+        # muestra los cuadros que llegan y le manda los movimientos del ratón
+        self.render_process = None
+        self.remote_canvas = None
+        self._remote_photo = None
+        self._drag_xy = None
         
         # Frame para el modelo 3D
         self.model_frame = ttk.Frame(self, style='TFrame') 
@@ -212,10 +464,15 @@ class DetailPanel(ttk.Frame):
         self.info_label_description = ttk.Label(self.info_labels_frame, text="", font=("arial", 16), style='TLabel', anchor='center')
         self.info_label_description.pack(fill=tk.X)
 
+        # Punto del modelo seleccionado con un clic
+        self.info_label_pick = ttk.Label(self.info_labels_frame, text="", font=("arial", 12), style='TLabel', anchor='center')
+        self.info_label_pick.pack(fill=tk.X, pady=(5, 0))
+
 
 
     def load_animal_data(self, animal_data):
         """Carga todos los datos del animal en el panel."""
+        self.current_animal = animal_data
         
         # Actualizar etiquetas de texto
         self.info_label_common.config(text=animal_data.get('nombre_comun', 'N/A'))
@@ -224,11 +481,30 @@ class DetailPanel(ttk.Frame):
 
         # Cargar modelo 3D
         obj_name = animal_data.get('ruta_modelo_3d') 
+
+        # Con paquete de catálogo, la malla se lee del mmap sin parsear nada
+        bundle = getattr(self.main_view.controller, 'bundle', None)
+        if bundle is not None and bundle.has_mesh(obj_name):
+            self._clear_widgets()
+            try:
+                content_hash = bundle.content_hash(obj_name)
+                self.show_mesh(
+                    *bundle.mesh(obj_name), metadata=animal_data,
+                    source=f"bundle:{content_hash}", content_hash=content_hash
+                )
+            except Exception as e:
+                print(f"Error cargando el modelo: {e}")
+                self.show_error(f"Error al cargar el modelo:\n{e}")
+            return
+
         obj_path = os.path.join(os.getcwd(), 'models', obj_name)
 
 
         if obj_path and os.path.exists(obj_path):
-            self.load_model(obj_path)
+            if self.render_process is not None:
+                self.load_model_remote(obj_path, animal_data)
+            else:
+                self.load_model(obj_path, animal_data)
         elif obj_path:
             print(f"No se encontró el archivo .obj en la ruta: {obj_path}")
             self.show_error(f"No se encontró: {obj_path}")
@@ -237,9 +513,12 @@ class DetailPanel(ttk.Frame):
             self.show_error(f"No hay modelo 3D para {animal_data['nombre_comun']}")
 
 
-    def load_model(self, filepath):
+    def load_model(self, filepath, metadata=None):
         """
         Carga un modelo .obj y lo muestra en el frame.
+        'metadata' (opcional) son los datos del animal; si traen la caja
+        envolvente calculada al importar este mismo .obj, se usa para fijar
+        los ejes.
         """
         if not os.path.exists(filepath):
             print(f"Error: No se encontró el archivo {filepath}")
@@ -250,48 +529,221 @@ class DetailPanel(ttk.Frame):
         self._clear_widgets()
 
         try:
-            # 2. Leer el archivo .obj usando meshio
-            mesh = meshio.read(filepath)
-            points = mesh.points
-            
-            if 'triangle' not in mesh.cells_dict:
-                if 'quad' in mesh.cells_dict:
-                     quads = mesh.cells_dict['quad']
-                     tri1 = quads[:, [0, 1, 2]]
-                     tri2 = quads[:, [0, 2, 3]]
-                     cells = np.vstack([tri1, tri2])
-                else:
-                    print("Error: No se encontraron 'triangle' o 'quad' en las celdas del mesh.")
-                    self.show_error("El modelo .obj no tiene una malla compatible.")
-                    return
-            else:
-                cells = mesh.cells_dict['triangle']
+            # 2. Leer el archivo .obj (la malla triangulada queda en caché)
+            try:
+                points, cells = load_mesh(filepath)
+            except UnsupportedMeshError as e:
+                print(f"Error: {e}")
+                self.show_error(str(e))
+                return
 
-            x, y, z = points[:, 0], points[:, 1], points[:, 2]
+            # load_mesh acaba de hashear el archivo: aquí solo se consulta
+            self.show_mesh(
+                points, cells, metadata, source=filepath,
+                content_hash=asset_store.known_hash(filepath)
+            )
 
-            # 3. Crear la figura de Matplotlib
-            self.figure = plt.figure(figsize=(5, 4))
-            self.figure.patch.set_facecolor('#f7f7f7') 
-            
-            ax = self.figure.add_subplot(111, projection='3d')
-            ax.set_facecolor('#f7f7f7')
-            ax.plot_trisurf(x, y, z, triangles=cells, cmap='viridis', edgecolor='none')
+        except Exception as e:
+            print(f"Error cargando el modelo: {e}")
+            self.show_error(f"Error al cargar el modelo:\n{e}")
+
+    def load_model_remote(self, filepath, metadata=None):
+        """
+        Carga y dibuja el modelo en el proceso de render: la ventana sigue
+        respondiendo aunque el .obj tarde en parsearse o lo tumbe. Arrastrar
+        gira el modelo y la rueda del ratón acerca o aleja (sin selección
+        de puntos: la malla no está en este proceso).
+        """
+        self._clear_widgets()
+        self.remote_canvas = tk.Canvas(
+            self.model_frame, width=1, height=1, bg='#f7f7f7', highlightthickness=0
+        )
+        self.remote_canvas.pack(fill=tk.BOTH, expand=True)
+        self.remote_canvas.create_text(
+            0, 0, text="Cargando modelo...", font=("arial", 16), tags='loading'
+        )
+        self.remote_canvas.bind('<Configure>', self._on_remote_configure)
+        self.remote_canvas.bind('<ButtonPress-1>', self._on_remote_press)
+        self.remote_canvas.bind('<B1-Motion>', self._on_remote_drag)
+        self.remote_canvas.bind('<MouseWheel>', lambda e: self._on_remote_wheel(e.delta > 0))
+        self.remote_canvas.bind('<Button-4>', lambda e: self._on_remote_wheel(True))
+        self.remote_canvas.bind('<Button-5>', lambda e: self._on_remote_wheel(False))
+
+        self.model_frame.update_idletasks()
+        self.render_process.resize(self.model_frame.winfo_width(), self.model_frame.winfo_height())
+        self.render_process.load(filepath, metadata)
+
+    def show_remote_frame(self, image):
+        """Muestra un cuadro dibujado por el proceso de render."""
+        if self.remote_canvas is None:
+            return  # el panel ya muestra otra cosa
+        self._remote_photo = ImageTk.PhotoImage(image)
+        self.remote_canvas.delete('all')
+        self.remote_canvas.create_image(0, 0, image=self._remote_photo, anchor='nw')
+
+    def show_remote_error(self, message):
+        if self.remote_canvas is not None:
+            self.show_error(message)
+
+    def _on_remote_configure(self, event):
+        self.remote_canvas.coords('loading', event.width / 2, event.height / 2)
+        self.render_process.resize(event.width, event.height)
+
+    def _on_remote_press(self, event):
+        self._drag_xy = (event.x, event.y)
+
+    def _on_remote_drag(self, event):
+        if self._drag_xy is None:
+            return
+        dx, dy = event.x - self._drag_xy[0], event.y - self._drag_xy[1]
+        self._drag_xy = (event.x, event.y)
+        step = self.remote_rotate_deg_per_px
+        self.render_process.rotate(-dx * step, dy * step)
+
+    def _on_remote_wheel(self, zoom_in):
+        self.render_process.zoom(1.1 if zoom_in else 1 / 1.1)
+
+    def show_mesh(self, points, cells, metadata=None, source=None, content_hash=None):
+        """
+        Dibuja una malla ya triangulada (points, cells) en el frame.
+        Los widgets anteriores ya deben estar limpios.
+        'source' identifica la malla (ruta del .obj o 'bundle:<hash>'); si
+        se da, se habilita la selección de puntos con un clic.
+        'content_hash' es el hash de la malla: la caja envolvente guardada
+        en 'metadata' solo se usa si se calculó con ese mismo contenido.
+        """
+        x, y, z = points[:, 0], points[:, 1], points[:, 2]
+        all_cells = cells
+
+        # Nivel de detalle: en modelos muy grandes se dibuja solo una
+        # parte de las caras (la vista 3D de matplotlib no da para más)
+        face_count = len(cells)
+        if face_count > self.max_render_faces:
+            step = -(-face_count // self.max_render_faces)  # techo
+            cells = cells[::step]
+
+        # 3. Crear la figura de Matplotlib
+        self.figure = plt.figure(figsize=(5, 4))
+        self.figure.patch.set_facecolor('#f7f7f7') 
+        
+        ax = self.figure.add_subplot(111, projection='3d')
+        self.ax = ax
+        ax.set_facecolor('#f7f7f7')
+        ax.plot_trisurf(x, y, z, triangles=cells, cmap='viridis', edgecolor='none')
+        bounds = stored_bounds(metadata, content_hash)
+        if bounds:
+            set_axes_limits(ax, *bounds)
+        else:
             self._auto_scale_axes(ax, x, y, z)
 
-            # 5. Incrustar la figura de Matplotlib en Tkinter
-            self.canvas = FigureCanvasTkAgg(self.figure, master=self.model_frame)
-            self.canvas.draw()
-            self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        # 5. Incrustar la figura de Matplotlib en Tkinter
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.model_frame)
+        self.canvas.draw()
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        # 6. Añadir la barra de herramientas de navegación
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self.model_frame)
+        self.toolbar.update()
+        # No empaquetes la barra de herramientas si no la quieres visible
+        # self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        # 7. Registrar la figura en el gestor de memoria; queda fijada
+        # mientras el panel está en pantalla (ver hide)
+        resource_manager.register(
+            'figure', self._figure_key, self._figure_size_bytes(),
+            self._clear_widgets, pinned=True
+        )
+
+        # 8. Selección de puntos (con la malla completa, no la reducida)
+        if source:
+            self.canvas.mpl_connect('button_press_event', self._on_press)
+            self.canvas.mpl_connect('button_release_event', self._on_release)
+            self._prepare_picking(source, points, all_cells)
+
+    def _prepare_picking(self, source, points, cells):
+        """
+        Obtiene el índice espacial de la malla. Si no está en caché se
+        construye en un hilo aparte (en modelos grandes tarda) y se guarda
+        en la caché ya en el hilo de Tk.
+        """
+        self._pick_source = source
+        self._pick_index = cached_mesh_index(source)
+        if self._pick_index is not None:
+            return
 
-            # 6. Añadir la barra de herramientas de navegación
-            self.toolbar = NavigationToolbar2Tk(self.canvas, self.model_frame)
-            self.toolbar.update()
-            # No empaquetes la barra de herramientas si no la quieres visible
-            # self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        def on_done(index):
+            cache_mesh_index(source, index)
+            # Si mientras tanto se abrió otro modelo, este índice ya no se usa aquí
+            if self._pick_source == source:
+                self._pick_index = index
 
-        except Exception as e:
-            print(f"Error cargando el modelo: {e}")
-            self.show_error(f"Error al cargar el modelo:\n{e}")
+        def on_error(error):
+            print(f"No se pudo preparar la selección del modelo: {error}")
+
+        self._index_tasks.submit(MeshIndex, points, cells, on_done=on_done, on_error=on_error)
+
+    def _on_press(self, event):
+        self._press_xy = (event.x, event.y)
+
+    def _on_release(self, event):
+        """Un clic sin arrastrar (arrastrar rota la vista) selecciona un punto."""
+        press, self._press_xy = self._press_xy, None
+        if event.button != 1 or press is None or event.inaxes is not self.ax:
+            return
+        if self.toolbar is not None and self.toolbar.mode:
+            return  # zoom o desplazamiento activos en la barra
+        if abs(event.x - press[0]) + abs(event.y - press[1]) > self.pick_tolerance_px:
+            return
+
+        index = self._pick_index
+        if index is None:
+            self.info_label_pick.config(text="Preparando la selección del modelo...")
+            return
+        origin, direction = self._click_ray(self.ax, event.xdata, event.ydata, index.mins, index.maxs)
+        self.show_pick(index.raycast(origin, direction))
+
+    @staticmethod
+    def _click_ray(ax, x, y, mins, maxs):
+        """
+        Rayo (origen, dirección) en coordenadas de la malla que pasa por el
+        punto (x, y) de la vista 3D, saliendo desde el lado de la cámara.
+        """
+        inverse = np.linalg.inv(ax.get_proj())
+        a = inverse @ [x, y, -1, 1]
+        b = inverse @ [x, y, 1, 1]
+        a = a[:3] / a[3]
+        direction = b[:3] / b[3] - a
+        direction /= np.linalg.norm(direction)
+
+        # Orientar el rayo desde la cámara hacia el modelo
+        camera = ax._get_camera_loc()
+        center = (np.asarray(mins) + np.asarray(maxs)) / 2.0
+        if np.dot(direction, center - camera) < 0:
+            direction = -direction
+        # Origen: la cámara, salvo en proyección ortográfica (cámara casi
+        # en el infinito), donde basta empezar justo antes del modelo
+        radius = np.linalg.norm(np.asarray(maxs) - np.asarray(mins))
+        start = max(np.dot(camera - a, direction), np.dot(center - a, direction) - radius)
+        return a + direction * start, direction
+
+    def show_pick(self, hit):
+        """Marca el punto seleccionado (resultado de MeshIndex.raycast) y lo describe."""
+        if self._pick_marker is not None:
+            self._pick_marker.remove()
+            self._pick_marker = None
+
+        if hit is None:
+            self.info_label_pick.config(text="No hay superficie del modelo en ese punto.")
+        else:
+            triangle, point, vertex = hit
+            self._pick_marker = self.ax.scatter(
+                [point[0]], [point[1]], [point[2]], color='red', s=40, depthshade=False
+            )
+            self.info_label_pick.config(
+                text=f"Punto seleccionado: x={point[0]:.3f}, y={point[1]:.3f}, z={point[2]:.3f} "
+                     f"(vértice {vertex}, triángulo {triangle})"
+            )
+        self.canvas.draw_idle()
 
     def show_error(self, message):
         """Muestra un mensaje de error en el panel."""
@@ -299,6 +751,10 @@ class DetailPanel(ttk.Frame):
         self.label = ttk.Label(self.model_frame, text=message, foreground="red", style='TLabel') # Aplicar estilo
         self.label.pack(pady=20, padx=20)
 
+    def hide(self):
+        """El panel dejó de verse: su figura ya puede desalojarse si falta memoria."""
+        resource_manager.unpin(self._figure_key)
+
     def _clear_widgets(self):
         """Destruye todos los widgets hijos del frame del modelo."""
         for widget in self.model_frame.winfo_children():
@@ -307,23 +763,298 @@ class DetailPanel(ttk.Frame):
         # Cerrar la figura de matplotlib para liberar memoria
         if self.figure:
             plt.close(self.figure)
+            resource_manager.unregister(self._figure_key)
             
         self.figure = None
         self.canvas = None
         self.toolbar = None
+        self.ax = None
+        self._pick_source = None
+        self._pick_index = None
+        self._pick_marker = None
+        self.remote_canvas = None
+        self._remote_photo = None
+        self._drag_xy = None
+        self.info_label_pick.config(text="")
+
+    def _figure_size_bytes(self):
+        """Estimación del tamaño de la figura (buffer RGBA de Agg)."""
+        width, height = self.figure.get_size_inches() * self.figure.dpi
+        return int(width * height * 4)
 
     def _auto_scale_axes(self, ax, x, y, z):
         """Ajusta los límites de los ejes para que el modelo no se vea deformado."""
-        max_range = np.array([x.max()-x.min(), y.max()-y.min(), z.max()-z.min()]).max() / 2.0
-        if max_range == 0: max_range = 1.0 # Evitar división por cero si es un punto
+        set_axes_limits(
+            ax,
+            (x.min(), y.min(), z.min()),
+            (x.max(), y.max(), z.max())
+        )
 
-        mid_x = (x.max()+x.min()) * 0.5
-        mid_y = (y.max()+y.min()) * 0.5
-        mid_z = (z.max()+z.min()) * 0.5
-        
-        ax.set_xlim(mid_x - max_range, mid_x + max_range)
-        ax.set_ylim(mid_y - max_range, mid_y + max_range)
-        ax.set_zlim(mid_z - max_range, mid_z + max_range)
+
+# --- Vista de comparación de varios modelos ---
+
+_mesh_process_pool = None
+
+
+def mesh_process_pool():
+    """
+    Pool de procesos compartido para parsear mallas en paralelo (meshio
+    es Python puro y con hilos no se aprovecharían varios núcleos). Se
+    crea la primera vez que se usa; 'spawn' evita heredar el estado de Tk.
+    Cada proceso vuelve a importar main.py, que por eso no importa esta
+    vista al cargarse: los procesos solo cargan data.mesh_loader.
+    """
+    global _mesh_process_pool
+    if _mesh_process_pool is None:
+        _mesh_process_pool = ProcessPoolExecutor(
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _mesh_process_pool
+
+
+class ComparisonPanel(ttk.Frame):
+    """
+    Muestra varios animales lado a lado, cada uno en un subplot 3D de una
+    sola figura. Las mallas que no están en caché se parsean a la vez en
+    el pool de procesos y cada modelo se dibuja en cuanto llega, así que
+    abrir N modelos tarda lo que el más lento y no la suma.
+
+    Todas las vistas comparten la cámara (shareview): al rotar una con el
+    ratón rotan todas, y un solo bucle con 'after' las hace girar juntas.
+    Mientras giran se dibujan con menos caras y sin ejes, y cada paso se
+    programa cuando termina el dibujado anterior, para que la ventana
+    siga respondiendo entre cuadros.
+    """
+    orbit_ms = 50  # Pausa entre el fin de un cuadro del giro y el siguiente
+    orbit_step_deg = 1.5
+    orbit_max_render_faces = 12_000  # Caras (entre todos los modelos) al girar
+
+    def __init__(self, parent, main_view, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.main_view = main_view
+        self.figure = None
+        self.canvas = None
+        self.axes = []
+        self.animals = []
+        self._figure_key = ('figure', id(self))
+        self._orbit_after_id = None
+        self._started_at = None
+        self._pending = 0
+        self._waiting = {}  # hash del .obj -> subplots que esperan esa malla
+        self._meshes = {}  # subplot -> (points, cells), para redibujar con otro detalle
+        self._surfaces = {}  # subplot -> superficie dibujada
+        self._tasks = None  # BackgroundTasks con el pool de procesos (se crea al usarlo)
+
+        top_bar = ttk.Frame(self, padding=10, style='TFrame')
+        top_bar.pack(fill=tk.X)
+        ttk.Button(
+            top_bar, text="< Volver a la lista", command=self.main_view.show_list_view
+        ).pack(side=tk.LEFT, padx=5)
+        self.orbit_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            top_bar, text="Girar", variable=self.orbit_var, command=self._toggle_orbit
+        ).pack(side=tk.LEFT, padx=10)
+        self.status_label = ttk.Label(top_bar, text="", style='TLabel')
+        self.status_label.pack(side=tk.LEFT, padx=10)
+
+        self.model_frame = ttk.Frame(self, style='TFrame')
+        self.model_frame.pack(fill=tk.BOTH, expand=True)
+
+    def load_animals(self, animals):
+        """Prepara un subplot por animal y empieza a cargar todas las mallas."""
+        self.clear()
+        self.animals = list(animals)
+        if not self.animals:
+            return
+        if self._tasks is None:
+            self._tasks = BackgroundTasks(self, mesh_process_pool())
+
+        columns = math.ceil(math.sqrt(len(self.animals)))
+        rows = math.ceil(len(self.animals) / columns)
+        self.figure = plt.figure(figsize=(4 * columns, 4 * rows))
+        self.figure.patch.set_facecolor('#f7f7f7')
+        for i, animal in enumerate(self.animals):
+            ax = self.figure.add_subplot(rows, columns, i + 1, projection='3d')
+            ax.set_facecolor('#f7f7f7')
+            ax.set_title(animal.get('nombre_comun', 'N/A'))
+            ax.text2D(0.5, 0.5, "Cargando...", transform=ax.transAxes, ha='center')
+            if self.orbit_var.get():
+                ax.set_axis_off()
+            if self.axes:
+                ax.shareview(self.axes[0])
+            self.axes.append(ax)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.model_frame)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        # La figura cuenta en el uso de memoria, pero está fijada: es la
+        # que se ve en pantalla y clear() la cierra al ocultar la vista
+        width, height = self.figure.get_size_inches() * self.figure.dpi
+        resource_manager.register('figure', self._figure_key, int(width * height * 4), self.clear, pinned=True)
+
+        self._started_at = time.perf_counter()
+        self._pending = len(self.animals)
+        self.status_label.config(text=f"Cargando {self._pending} modelos...")
+        for i, animal in enumerate(self.animals):
+            self._load_mesh(i, animal)
+        self.canvas.draw_idle()
+        self._update_orbit()
+
+    def _load_mesh(self, i, animal):
+        """Dibuja la malla si ya está disponible; si no, la parsea en el pool."""
+        obj_name = animal.get('ruta_modelo_3d')
+        bundle = getattr(self.main_view.controller, 'bundle', None)
+        if bundle is not None and bundle.has_mesh(obj_name):
+            self._show_mesh(i, *bundle.mesh(obj_name), bundle.content_hash(obj_name))
+            return
+
+        obj_path = os.path.join(os.getcwd(), 'models', obj_name or '')
+        if not obj_name or not os.path.exists(obj_path):
+            self._show_error(i, f"No se encontró: {obj_name}")
+            return
+        cached = cached_mesh(obj_path)
+        if cached is not None:
+            self._show_mesh(i, *cached, asset_store.known_hash(obj_path))
+            return
+
+        # Los animales con el mismo archivo esperan un solo parseo. La clave
+        # sale de un stat: el hash del contenido se calcula en el pool,
+        # junto con el parseo, para no leer el .obj en el hilo de Tk
+        stat = os.stat(obj_path)
+        key = (os.path.abspath(obj_path), stat.st_mtime_ns, stat.st_size)
+        if key in self._waiting:
+            self._waiting[key].append(i)
+            return
+        self._waiting[key] = [i]
+
+        def on_done(result):
+            points, cells, signature = result
+            points, cells = cache_mesh(obj_path, points, cells, signature)
+            for j in self._waiting.pop(key, []):
+                self._show_mesh(j, points, cells, signature[2])
+
+        def on_error(error):
+            for j in self._waiting.pop(key, []):
+                self._show_error(j, f"Error al cargar el modelo:\n{error}")
+
+        self._tasks.submit(parse_mesh_with_signature, obj_path, on_done=on_done, on_error=on_error)
+
+    def _show_mesh(self, i, points, cells, content_hash):
+        for text in list(self.axes[i].texts):
+            text.remove()
+        self._meshes[i] = (points, cells, content_hash)
+        self._plot_mesh(i)
+        self._model_ready()
+
+    def _plot_mesh(self, i):
+        """(Re)dibuja la malla de un subplot con el nivel de detalle actual."""
+        ax = self.axes[i]
+        points, cells, content_hash = self._meshes[i]
+        metadata = self.animals[i]
+
+        # El presupuesto de caras se reparte entre todos los modelos
+        budget = self.orbit_max_render_faces if self.orbit_var.get() else DetailPanel.max_render_faces
+        max_faces = max(1, budget // len(self.animals))
+        if len(cells) > max_faces:
+            cells = cells[::-(-len(cells) // max_faces)]
+
+        previous = self._surfaces.pop(i, None)
+        if previous is not None:
+            previous.remove()
+        x, y, z = points[:, 0], points[:, 1], points[:, 2]
+        self._surfaces[i] = ax.plot_trisurf(x, y, z, triangles=cells, cmap='viridis', edgecolor='none')
+        bounds = stored_bounds(metadata, content_hash)
+        if bounds:
+            set_axes_limits(ax, *bounds)
+        else:
+            set_axes_limits(ax, (x.min(), y.min(), z.min()), (x.max(), y.max(), z.max()))
+
+    def _show_error(self, i, message):
+        ax = self.axes[i]
+        for text in list(ax.texts):
+            text.remove()
+        ax.text2D(0.5, 0.5, message, transform=ax.transAxes, ha='center', color='red')
+        self._model_ready()
+
+    def _model_ready(self):
+        self._pending -= 1
+        if self._pending == 0:
+            elapsed = time.perf_counter() - self._started_at
+            print(f"Comparación de {len(self.animals)} modelos lista en {elapsed:.2f} s")
+            self.status_label.config(text=f"{len(self.animals)} modelos ({elapsed:.2f} s)")
+        else:
+            self.status_label.config(text=f"Cargando {self._pending} modelos...")
+        self.canvas.draw_idle()
+
+    def _toggle_orbit(self):
+        """
+        Al activar el giro, los modelos se redibujan con pocas caras y sin
+        ejes; al desactivarlo, vuelven al detalle normal.
+        """
+        orbit = self.orbit_var.get()
+        for ax in self.axes:
+            if orbit:
+                ax.set_axis_off()
+            else:
+                ax.set_axis_on()
+        for i in self._meshes:
+            self._plot_mesh(i)
+        self._update_orbit()
+        if self.canvas:
+            self.canvas.draw_idle()
+
+    def _update_orbit(self):
+        """Inicia o detiene el giro automático según la casilla."""
+        if self.orbit_var.get() and self.axes:
+            if self._orbit_after_id is None:
+                self._orbit_after_id = self.after(self.orbit_ms, self._orbit_step)
+        elif self._orbit_after_id is not None:
+            self.after_cancel(self._orbit_after_id)
+            self._orbit_after_id = None
+
+    def _on_draw(self, event):
+        """Al terminar un dibujado, programa el siguiente paso del giro."""
+        if self.orbit_var.get() and self.axes and self._orbit_after_id is None:
+            self._orbit_after_id = self.after(self.orbit_ms, self._orbit_step)
+
+    def _orbit_step(self):
+        """
+        Un paso del giro: mueve la cámara compartida y pide un dibujado.
+        El siguiente paso lo programa _on_draw cuando ese dibujado termina.
+        """
+        self._orbit_after_id = None
+        if not self.axes:
+            return
+        leader = self.axes[0]
+        leader.view_init(
+            elev=leader.elev, azim=leader.azim + self.orbit_step_deg, roll=leader.roll, share=True
+        )
+        self.canvas.draw_idle()
+
+    def stop(self):
+        """Detiene el giro y descarta las cargas pendientes (al ocultar la vista)."""
+        if self._orbit_after_id is not None:
+            self.after_cancel(self._orbit_after_id)
+            self._orbit_after_id = None
+        if self._tasks is not None:
+            self._tasks.cancel_all()
+
+    def clear(self):
+        """Cierra la figura y olvida los modelos mostrados."""
+        self.stop()
+        for widget in self.model_frame.winfo_children():
+            widget.destroy()
+        if self.figure:
+            plt.close(self.figure)
+            resource_manager.unregister(self._figure_key)
+        self.figure = None
+        self.canvas = None
+        self.axes = []
+        self.animals = []
+        self._waiting = {}
+        self._meshes = {}
+        self._surfaces = {}
+        self.status_label.config(text="")
 
 
 # --- Clase Principal de la Vista ---
@@ -334,8 +1065,13 @@ class MainView(tk.Tk):
     """
     font_titulos = ("arial", 20, "bold")
     font_estados = ("arial", 16, "bold")
+    page_size = 50  # Tarjetas por página (por estado o por búsqueda)
+    change_poll_ms = 2000  # Cada cuánto se revisan la DB y las carpetas
+    card_size = CardGrid.cell_size  # Tamaño de una tarjeta (ancho, alto)
+    max_compare = 6  # Animales que se pueden comparar a la vez
+    search_delay_ms = 150  # Pausa al teclear antes de buscar
 
-    def __init__(self, controller):
+    def __init__(self, controller, render_in_process=False):
         super().__init__()
         self.title("Catálogo de Fauna Mexicana 3D")
         
@@ -344,10 +1080,37 @@ class MainView(tk.Tk):
         self.geometry("1280x720") # Añadido para un tamaño predeterminado
         
         self.search_icon_image = None
+        self._search_after_id = None  # búsqueda pendiente (ver _schedule_search)
+        # Construye la lista por trozos sin bloquear la ventana
+        self.builder = IncrementalBuilder(self)
+        # Animales marcados para comparar (Ctrl+clic): id -> datos, en orden
+        self.compare_selection = {}
         
         self._setup_styles()
         self._setup_layout()
 
+        # Modelos 3D cargados y dibujados en otro proceso (opcional)
+        self.render_process = None
+        if render_in_process:
+            self.render_process = RenderProcess(
+                self,
+                on_frame=self.detail_view.show_remote_frame,
+                on_error=self.detail_view.show_remote_error,
+                max_render_faces=DetailPanel.max_render_faces,
+            )
+            self.detail_view.render_process = self.render_process
+
+        # Detectar cambios en la DB y en img/ y models/ sin reiniciar (con
+        # un paquete de catálogo no hay nada que vigilar: todo sale del
+        # paquete, que no cambia mientras está abierto)
+        self.change_tracker = None
+        self._asset_tasks = None  # BackgroundTasks para recalcular metadatos de modelos
+        self._asset_jobs = {}  # ID del animal -> marca del último recálculo pedido
+        if controller and getattr(controller, 'bundle', None) is None:
+            self.change_tracker = ChangeTracker(controller.conn)
+        if self.change_tracker:
+            self.after(self.change_poll_ms, self._poll_changes)
+
     @staticmethod
     def _load_image(path, size=None):
         """Método auxiliar estático para cargar imágenes."""
@@ -365,6 +1128,94 @@ class MainView(tk.Tk):
             print(f"Error abriendo la imagen {path}: {e}")
             return None
 
+    # Caché de miniaturas compartida por todas las tarjetas:
+    # ('thumbnail', hash del contenido, tamaño) -> PhotoImage. Las filas que
+    # usan la misma imagen (aunque sea con otra ruta) comparten una instancia.
+    _thumbnail_cache = {}
+
+    @staticmethod
+    def _load_bundle_thumbnail(bundle, ruta_img):
+        """Miniatura leída del atlas del paquete (ya viene redimensionada)."""
+        key = ('thumbnail', f"bundle:{bundle.content_hash(ruta_img)}", None)
+        image = MainView._thumbnail_cache.get(key)
+        if image is not None:
+            resource_manager.touch(key)
+            return image
+
+        image = ImageTk.PhotoImage(bundle.thumbnail_image(ruta_img))
+        MainView._thumbnail_cache[key] = image
+        resource_manager.register(
+            'thumbnail', key, image.width() * image.height() * 4,
+            lambda: MainView._thumbnail_cache.pop(key, None), obj=image
+        )
+        return image
+
+    @staticmethod
+    def _evict_thumbnails(content_hash):
+        """Olvida las miniaturas en caché de un contenido (en cualquier tamaño)."""
+        for key in [key for key in MainView._thumbnail_cache if key[1] == content_hash]:
+            MainView._thumbnail_cache.pop(key, None)
+            resource_manager.unregister(key)
+
+    @staticmethod
+    def _load_thumbnail(path, size):
+        """
+        Igual que _load_image, pero reutiliza la miniatura si ya se cargó.
+        Cada miniatura se registra en el gestor de memoria; al desalojarla
+        solo se suelta la referencia de la caché (las tarjetas visibles
+        conservan la suya).
+        """
+        if not os.path.exists(path):
+            return MainView._load_image(path, size=size)  # avisa que no existe
+        key = ('thumbnail', asset_store.content_hash(path), size)
+        image = MainView._thumbnail_cache.get(key)
+        if image is not None:
+            resource_manager.touch(key)
+            return image
+
+        image = MainView._load_image(path, size=size)
+        if image is None:
+            return None
+        MainView._thumbnail_cache[key] = image
+        resource_manager.register(
+            'thumbnail', key, image.width() * image.height() * 4,
+            lambda: MainView._thumbnail_cache.pop(key, None), obj=image
+        )
+        return image
+
+    def _load_card_image(self, animal_data):
+        """Carga la miniatura de la tarjeta de un animal para CardGrid."""
+        try:
+            # Si hay paquete de catálogo, la miniatura sale de su atlas
+            bundle = getattr(self.controller, 'bundle', None)
+            if bundle is not None and bundle.has_thumbnail(animal_data.get('ruta_img')):
+                return self._load_bundle_thumbnail(bundle, animal_data['ruta_img'])
+
+            # Usar la miniatura precalculada al importar, si existe
+            ruta_miniatura = animal_data.get('ruta_miniatura')
+            if ruta_miniatura:
+                path_thumbnail = os.path.join(os.getcwd(), 'img', ruta_miniatura)
+                if os.path.exists(path_thumbnail):
+                    return self._load_thumbnail(path_thumbnail, size=(100, 100))
+
+            # Intentar cargar la imagen real (la fila ya suele traer la ruta)
+            name_img = animal_data.get('ruta_img') or self.controller.load_img_name(animal_data['id'])
+            path_img_animal = os.path.join(os.getcwd(), 'img', name_img)
+            return self._load_thumbnail(path_img_animal, size=(100, 100))
+        except Exception as e:
+            # Fallback si el controlador o la imagen fallan (para testing)
+            print(f"Error cargando imagen real {animal_data.get('id')}: {e}")
+            try:
+                # Intentar cargar imagen de placeholder
+                placeholder_path = animal_data.get('placeholder_img')
+                if placeholder_path and os.path.exists(placeholder_path):
+                     return self._load_image(placeholder_path, size=(100, 100))
+                else:
+                    return None
+            except Exception as e2:
+                print(f"Error cargando imagen placeholder: {e2}")
+                return None
+
     def _setup_styles(self):
         """Configura los estilos de la aplicación."""
         style = ttk.Style()
@@ -403,6 +1254,10 @@ class MainView(tk.Tk):
         # Pasar 'self' (MainView) al DetailPanel
         self.detail_view = DetailPanel(self.content_area, self, style='TFrame') 
         self.detail_view.grid(row=0, column=0, sticky="nsew")
+
+        # Vista de comparación (varios modelos lado a lado)
+        self.comparison_view = ComparisonPanel(self.content_area, self, style='TFrame')
+        self.comparison_view.grid(row=0, column=0, sticky="nsew")
         
         # 5. Guardar referencia al container de la lista
         self.content_container = self.scroll_area.scrollable_frame
@@ -446,88 +1301,460 @@ class MainView(tk.Tk):
 
         self.search_entry = ttk.Entry(search_frame)
         self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        self.search_entry.bind("<KeyRelease>", self._on_search_change)
+        self.search_entry.bind("<KeyRelease>", self._schedule_search)
+
+        # --- Comparación ---
+        compare_frame = ttk.Frame(menu_lateral_frame, style='TFrame')
+        compare_frame.pack(fill=tk.X, padx=10, pady=(10, 10))
+        self.compare_label = ttk.Label(
+            compare_frame, text="", style='TLabel', wraplength=200, justify='left'
+        )
+        self.compare_label.pack(fill=tk.X)
+        self.compare_button = ttk.Button(
+            compare_frame, text="Comparar", command=self.show_comparison_view
+        )
+        self.compare_button.pack(side=tk.LEFT, pady=(5, 0))
+        ttk.Button(
+            compare_frame, text="Limpiar", command=self._clear_compare_selection
+        ).pack(side=tk.LEFT, padx=(5, 0), pady=(5, 0))
+        self._update_compare_controls()
         
         # El ScrollableFrame YA NO se crea aquí
         
         return menu_lateral_frame
 
+    def _schedule_search(self, event=None):
+        """
+        Espera a que el usuario deje de teclear 'search_delay_ms' antes de
+        buscar, para no consultar la DB en cada tecla.
+        """
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(self.search_delay_ms, self._on_search_change)
+
     def _on_search_change(self, event=None):
         """
         Se llama cada vez que el usuario teclea en la barra de búsqueda.
         Filtra estados Y animales y vuelve a poblar el contenido.
         """
+        self._search_after_id = None
         search_term = self.search_entry.get()
         
         # Asegurarse de que el controlador existe
         if not self.controller:
             print("Controlador no inicializado.")
             return
-            
-        filtered_data = self.controller.get_filtered_data(search_term)
+
+        # Cancelar la construcción anterior antes de destruir sus widgets
+        self.builder.cancel()
         
         for widget in self.content_container.winfo_children():
             widget.destroy()
 
-        self._populate_content(self.content_container, filtered_data)
+        self._populate_content(self.content_container, search_term)
         
         self.show_list_view()
 
-    def _populate_content(self, container, data_to_display = None):
+    def _populate_content(self, container, search_term=''):
         """
-        Carga y muestra las tarjetas de animales en el 'container'.
+        Programa la construcción de la primera página de tarjetas en el
+        'container'. Sin búsqueda se muestra una página por estado (con su
+        propio botón "Cargar más"); con búsqueda, una página de resultados
+        con un botón al final. Las tarjetas se crean por trozos para que
+        la ventana siga respondiendo.
         """
         if not self.controller:
              print("Controlador no inicializado.")
              return
-             
-        if data_to_display is None:
-            try:
-                states = self.controller.load_initial_states()
-                data_to_display = {}
-                for state_name in states:
-                    data_to_display[state_name] = self.controller.load_animals_by_state(state_name)
-            except Exception as e:
-                print(f"Error cargando datos iniciales: {e}")
-                ttk.Label(container, text=f"Error cargando datos: {e}").pack()
-                return
 
-        if not data_to_display:
-            ttk.Label(container, text="No se encontraron animales.").pack()
+        self._search_term = search_term.strip()
+        self._last_section = None  # (estado, contenedor de tarjetas)
+        self._search_more = False  # quedan páginas de resultados por cargar
+        # Secciones en pantalla por estado: título, tarjetas y si quedan
+        # páginas por cargar (para actualizar la lista sin reconstruirla)
+        self._sections = {}
+
+        self.builder.start(
+            self._build_content(container),
+            first_batch=self._first_screen_cards()
+        )
+
+    def _first_screen_cards(self):
+        """Cuántas tarjetas caben, aproximadamente, en la primera pantalla."""
+        width = self.scroll_area.winfo_width()
+        height = self.scroll_area.winfo_height()
+        if width <= 1 or height <= 1:  # la ventana aún no se ha dibujado
+            width, height = 1280, 720
+        rows = height // self.card_size[1] + 1
+        cols = width // self.card_size[0] + 1
+        return rows * cols
+
+    def _build_content(self, container):
+        """Generador que construye la lista; hace 'yield' tras cada tarjeta."""
+        try:
+            if self._search_term:
+                yield from self._load_search_page(container, cursor=None)
+            else:
+                # Solo se consultan los estados que el resumen marca como no vacíos
+                for summary in self.controller.load_state_summary(only_non_empty=True):
+                    section, card_grid = self._create_state_section(
+                        container, summary['nombre'], summary['total']
+                    )
+                    yield from self._load_state_page(section, card_grid, summary['nombre'], cursor=None)
+        except Exception as e:
+            print(f"Error cargando datos: {e}")
+            ttk.Label(container, text=f"Error cargando datos: {e}").pack()
             return
-            
-        for state_name, animals in data_to_display.items():
-            
-            if not animals:
-                continue
-            
-            ttk.Label(
-                container,
-                text=state_name,
-                anchor='center',
-                font=self.font_titulos
-            ).pack(fill='x', padx=10, pady=(10, 5))
-
-            # Contenedor para la fila de tarjetas
-            cards_wrapper_frame = ttk.Frame(container, style='TFrame')          
-            cards_wrapper_frame.pack() 
-            
-            for animal in animals:
-                animal_card = AnimalCard(
-                    cards_wrapper_frame, 
-                    self.controller, 
-                    animal,
-                    self  
-                )
-                animal_card.pack(side=tk.LEFT, fill=tk.Y, padx=5, pady=5)
+
+        if not container.winfo_children():
+            ttk.Label(container, text="No se encontraron animales.").pack()
+
+    def _create_state_section(self, container, state_name, total=None):
+        """
+        Crea el título de un estado y el contenedor de sus tarjetas.
+        'total' (animales del estado) se muestra junto al nombre si se da.
+        """
+        section = ttk.Frame(container, style='TFrame')
+        section.pack(fill='x')
+
+        header = ttk.Label(
+            section,
+            text=self._section_title(state_name, total),
+            anchor='center',
+            font=self.font_titulos
+        )
+        header.pack(fill='x', padx=10, pady=(10, 5))
+
+        # Cuadrícula (un solo Canvas) para las tarjetas del estado
+        card_grid = CardGrid(
+            section, on_select=self.show_detail_view,
+            on_toggle=self._toggle_compare, is_selected=self._is_compare_selected
+        )
+        card_grid.pack(fill='x', padx=5, pady=5)
+        self.scroll_area._bind_mouse_wheel(card_grid)
+        self._sections[state_name] = {'header': header, 'grid': card_grid, 'more': False}
+        return section, card_grid
+
+    @staticmethod
+    def _section_title(state_name, total):
+        return state_name if total is None else f"{state_name} ({total})"
+
+    def _add_cards(self, card_grid, animals):
+        for animal in animals:
+            card_grid.add_card(animal, self._load_card_image(animal))
+            yield
+
+    def _load_state_page(self, section, card_grid, state_name, cursor):
+        """Añade la siguiente página de un estado a su sección."""
+        animals, next_cursor = self.controller.load_animals_by_state_page(
+            state_name, self.page_size, cursor
+        )
+        yield from self._add_cards(card_grid, animals)
+
+        self._sections[state_name]['more'] = bool(next_cursor)
+        if next_cursor:
+            more_button = ttk.Button(section, text="Cargar más")
+            more_button.configure(command=lambda: self._queue_page(
+                more_button, self._load_state_page(section, card_grid, state_name, next_cursor)
+            ))
+            more_button.pack(pady=(0, 5))
+
+    def _queue_page(self, button, page):
+        """
+        Clic en "Cargar más": el botón se quita antes de encolar la página,
+        para que un segundo clic (con el constructor aún ocupado) no pida
+        la misma página otra vez.
+        """
+        button.destroy()
+        self.builder.queue(page)
+
+    def _load_search_page(self, container, cursor):
+        """
+        Añade la siguiente página de resultados de búsqueda. Las filas
+        vienen ordenadas por estado, así que se continúa la última
+        sección si el estado no cambió.
+        """
+        animals, next_cursor = self.controller.get_filtered_page(
+            self._search_term, self.page_size, cursor
+        )
+
+        # Agrupar las filas consecutivas del mismo estado
+        start = 0
+        while start < len(animals):
+            state_name = animals[start]['estado']
+            end = start
+            while end < len(animals) and animals[end]['estado'] == state_name:
+                end += 1
+
+            if self._last_section is None or self._last_section[0] != state_name:
+                _, card_grid = self._create_state_section(container, state_name)
+                self._last_section = (state_name, card_grid)
+            yield from self._add_cards(self._last_section[1], animals[start:end])
+            start = end
+
+        self._search_more = bool(next_cursor)
+        if next_cursor:
+            more_button = ttk.Button(container, text="Cargar más resultados")
+            more_button.configure(command=lambda: self._queue_page(
+                more_button, self._load_search_page(container, next_cursor)
+            ))
+            more_button.pack(pady=10)
     
+    def _poll_changes(self):
+        """Revisa periódicamente si algo cambió y lo aplica."""
+        try:
+            changes = self.change_tracker.check()
+            if changes:
+                print(f"Cambios detectados: {changes}")
+                self._apply_changes(changes)
+        except Exception as e:
+            print(f"Error revisando cambios: {e}")
+        self.after(self.change_poll_ms, self._poll_changes)
+
+    def _apply_changes(self, changes):
+        """
+        Invalida solo lo afectado: miniaturas y mallas de los archivos que
+        cambiaron, y las tarjetas de los animales agregados, quitados o
+        modificados. La lista se reconstruye solo si aparece o desaparece
+        la sección de un estado.
+        """
+        # 1. Cachés de archivos: se olvida el hash de cada ruta; lo que
+        #    estaba en caché con ese contenido se libera si ninguna otra
+        #    ruta lo comparte
+        for path in changes.changed_files:
+            content_hash = asset_store.forget(path)
+            if content_hash is not None:
+                self._evict_thumbnails(content_hash)
+                evict_mesh_content(content_hash)
+
+        # 1b. Metadatos guardados de los modelos que cambiaron (caja
+        #     envolvente, caras): se recalculan en el pool
+        models_dir = os.path.abspath(os.path.join(os.getcwd(), 'models'))
+        changed_models = [
+            os.path.relpath(path, models_dir) for path in changes.changed_files
+            if path.startswith(models_dir + os.sep)
+        ]
+        if changed_models:
+            self._refresh_asset_metadata(changed_models)
+
+        # 2. Índice de búsqueda (si otra herramienta cambió filas)
+        if changes.rows_changed:
+            self.controller.refresh_search_index(changes.modified_ids)
+
+        # 3. Lista (si todavía se está construyendo, se vuelve a empezar:
+        #    la página en curso pudo leerse antes del cambio)
+        if self.builder.busy or not self._update_list(changes):
+            self.builder.cancel()
+            for widget in self.content_container.winfo_children():
+                widget.destroy()
+            self._populate_content(self.content_container, self._search_term)
+
+        # 4. Panel de detalles, si muestra un animal afectado
+        animal = self.detail_view.current_animal
+        if animal and self.detail_view.winfo_ismapped():
+            model_path = os.path.abspath(os.path.join(os.getcwd(), 'models', animal.get('ruta_modelo_3d') or ''))
+            if animal['id'] in changes.modified_ids or model_path in changes.changed_files:
+                updated = self.controller.get_animal(animal['id'])
+                if updated:
+                    self.detail_view.load_animal_data(updated)
+
+    def _refresh_asset_metadata(self, rutas_modelo):
+        """
+        Recalcula en el pool de procesos (con preprocess_animal) los
+        metadatos de los animales que usan estos modelos, una vez por par
+        de archivos (modelo, imagen). Al terminar se guardan y se aplican
+        como una modificación de esas filas; si el archivo ya no sirve (o
+        se borró), los metadatos se borran.
+        """
+        if self._asset_tasks is None:
+            self._asset_tasks = BackgroundTasks(self, mesh_process_pool())
+
+        groups = {}
+        for animal in self.controller.animals_with_models(rutas_modelo):
+            groups.setdefault((animal['ruta_modelo_3d'], animal['ruta_img']), []).append(animal['id'])
+
+        def finish(animal_ids, job, metadatos):
+            # Si el archivo volvió a cambiar, vale el recálculo más nuevo
+            current = {animal_id for animal_id in animal_ids if self._asset_jobs.get(animal_id) is job}
+            if not current:
+                return
+            for animal_id in current:
+                del self._asset_jobs[animal_id]
+            self.controller.save_asset_metadata(current, metadatos)
+            changes = ChangeSet()
+            changes.modified_ids = current
+            self._apply_changes(changes)
+
+        for (ruta_modelo_3d, ruta_img), animal_ids in groups.items():
+            job = object()
+            for animal_id in animal_ids:
+                self._asset_jobs[animal_id] = job
+
+            def on_done(metadatos, animal_ids=animal_ids, job=job):
+                finish(animal_ids, job, metadatos)
+
+            def on_error(error, animal_ids=animal_ids, job=job):
+                print(f"No se pudieron recalcular los metadatos de '{ruta_modelo_3d}': {error}")
+                finish(animal_ids, job, None)
+
+            self._asset_tasks.submit(
+                preprocess_animal, ruta_modelo_3d, ruta_img, os.getcwd(),
+                on_done=on_done, on_error=on_error
+            )
+
+    @staticmethod
+    def _list_key(animal):
+        """Orden de la lista (el mismo ORDER BY de las consultas paginadas)."""
+        return animal['estado'], animal['nombre_comun'], animal['id']
+
+    def _update_list(self, changes):
+        """
+        Aplica los cambios a las tarjetas ya dibujadas: redibuja en su lugar
+        las modificadas (o cuyo archivo cambió), quita las borradas e
+        inserta las nuevas en su posición. Una tarjeta que cambia de lugar
+        (p. ej. de estado o de nombre) se quita y se vuelve a insertar.
+        Devuelve False si hace falta reconstruir la lista.
+        """
+        incoming = [self.controller.get_animal(animal_id) for animal_id in changes.added_ids]
+        for animal_id in changes.removed_ids:
+            self.compare_selection.pop(animal_id, None)
+        self._update_compare_controls()
+
+        for info in self._sections.values():
+            card_grid = info['grid']
+            for index in reversed(range(len(card_grid.animals))):
+                animal = card_grid.animals[index]
+                if animal['id'] in changes.removed_ids:
+                    card_grid.remove_card(index)
+                elif animal['id'] in changes.modified_ids:
+                    updated = self.controller.get_animal(animal['id'])
+                    if updated is not None and self._list_key(updated) == self._list_key(animal):
+                        card_grid.update_card(index, updated, self._load_card_image(updated))
+                    else:
+                        card_grid.remove_card(index)
+                        incoming.append(updated)
+                elif self._uses_file(animal, changes.changed_files):
+                    card_grid.update_card(index, animal, self._load_card_image(animal))
+            if not card_grid.animals and not info['more']:
+                return False  # la sección se quedó vacía
+
+        incoming = [animal for animal in incoming if animal is not None]
+        if self._search_term and incoming:
+            matches = self.controller.filter_matching_ids(
+                self._search_term, [animal['id'] for animal in incoming]
+            )
+            incoming = [animal for animal in incoming if animal['id'] in matches]
+        for animal in incoming:
+            if not self._insert_card(animal):
+                return False
+
+        # Títulos con el total de cada estado (solo sin búsqueda)
+        if not self._search_term and changes.rows_changed:
+            totals = {row['nombre']: row['total']
+                      for row in self.controller.load_state_summary(only_non_empty=True)}
+            if totals.keys() != self._sections.keys():
+                return False  # aparece o desaparece un estado
+            for state_name, info in self._sections.items():
+                info['header'].configure(text=self._section_title(state_name, totals[state_name]))
+        return True
+
+    def _insert_card(self, animal):
+        """
+        Inserta la tarjeta de un animal nuevo en su sección y posición. Si
+        cae después de lo ya cargado de una lista con más páginas, no se
+        dibuja: llegará con "Cargar más". Devuelve False si su sección no
+        existe y haría falta crearla.
+        """
+        key = self._list_key(animal)
+        if self._search_term and self._search_more:
+            # Con búsqueda, las páginas que faltan van después de la última
+            # tarjeta de la última sección
+            last_grid = self._last_section[1] if self._last_section else None
+            if last_grid is None or not last_grid.animals:
+                return False
+            if key > self._list_key(last_grid.animals[-1]):
+                return True
+        info = self._sections.get(animal['estado'])
+        if info is None:
+            return False
+
+        card_grid = info['grid']
+        index = bisect.bisect([self._list_key(other) for other in card_grid.animals], key)
+        if index == len(card_grid.animals) and info['more']:
+            return True
+        card_grid.insert_card(index, animal, self._load_card_image(animal))
+        return True
+
+    @staticmethod
+    def _uses_file(animal, paths):
+        """True si la miniatura o imagen del animal está entre 'paths'."""
+        img_dir = os.path.join(os.getcwd(), 'img')
+        for column in ('ruta_miniatura', 'ruta_img'):
+            if animal.get(column) and os.path.abspath(os.path.join(img_dir, animal[column])) in paths:
+                return True
+        return False
+
+    def _card_grids(self):
+        for section in self.content_container.winfo_children():
+            for child in section.winfo_children():
+                if isinstance(child, CardGrid):
+                    yield child
+
+    def _is_compare_selected(self, animal_data):
+        return animal_data['id'] in self.compare_selection
+
+    def _toggle_compare(self, animal_data):
+        """Marca o desmarca un animal para comparar."""
+        if animal_data['id'] in self.compare_selection:
+            del self.compare_selection[animal_data['id']]
+        elif len(self.compare_selection) >= self.max_compare:
+            print(f"Solo se pueden comparar {self.max_compare} animales a la vez.")
+        else:
+            self.compare_selection[animal_data['id']] = animal_data
+        self._update_compare_controls()
+
+    def _clear_compare_selection(self):
+        selected = set(self.compare_selection)
+        self.compare_selection.clear()
+        for card_grid in self._card_grids():
+            for index, animal in enumerate(card_grid.animals):
+                if animal['id'] in selected:
+                    card_grid.redraw_card(index)
+        self._update_compare_controls()
+
+    def _update_compare_controls(self):
+        count = len(self.compare_selection)
+        if count:
+            names = ', '.join(animal['nombre_comun'] for animal in self.compare_selection.values())
+            self.compare_label.config(text=f"Comparar ({count}/{self.max_compare}): {names}")
+        else:
+            self.compare_label.config(text="Ctrl+clic en una tarjeta para compararla.")
+        self.compare_button.state(['!disabled'] if count >= 2 else ['disabled'])
+
+    def show_comparison_view(self):
+        """Muestra los animales seleccionados lado a lado."""
+        if len(self.compare_selection) < 2:
+            return
+        self.scroll_area.grid_remove()
+        self.detail_view.grid_remove()
+        self.detail_view.hide()
+        self.comparison_view.grid()
+        self.comparison_view.load_animals(self.compare_selection.values())
+
     def show_detail_view(self, animal_data):
         """Oculta la lista y muestra el panel de detalles."""
         self.scroll_area.grid_remove() # Ocultar lista
+        self._hide_comparison_view()
         self.detail_view.grid() # Mostrar detalles
         self.detail_view.load_animal_data(animal_data) # Cargar datos
 
     def show_list_view(self):
         """Oculta el panel de detalles y muestra la lista."""
         self.detail_view.grid_remove() # Ocultar detalles
-        self.scroll_area.grid() # Mostrar lista
\ No newline at end of file
+        self.detail_view.hide()
+        self._hide_comparison_view()
+        self.scroll_area.grid() # Mostrar lista
+
+    def _hide_comparison_view(self):
+        self.comparison_view.grid_remove()
+        self.comparison_view.clear()
\ No newline at end of file
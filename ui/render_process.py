@@ -0,0 +1,309 @@
+import multiprocessing
+import struct
+from multiprocessing import shared_memory
+
+from PIL import Image
+
+from data.asset_store import asset_store
+from data.model_bounds import stored_bounds, set_axes_limits
+
+# Cuadro más grande que se puede transferir (ancho * alto * RGBA)
+MAX_FRAME_SIZE = (2560, 1600)
+# Cabecera del cuadro en la memoria compartida: secuencia, ancho, alto.
+# La secuencia vale 0 mientras el proceso de render escribe los píxeles.
+_FRAME_HEADER = struct.Struct('<QII')
+_PIXELS_OFFSET = 64
+_DPI = 100
+
+
+# --- Lado del proceso de render ---
+
+def render_worker(conn, shm_name, max_render_faces):
+    """
+    Bucle del proceso de render: parsea la malla y la dibuja con Agg (sin
+    ventana). Cada cuadro se escribe en la memoria compartida y se avisa
+    por 'conn' con ('frame', id de la carga, secuencia). Si llegan varios
+    comandos de cámara seguidos, solo se dibuja el último estado.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from data.mesh_loader import load_mesh
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    figure = FigureCanvasAgg(Figure(dpi=_DPI, facecolor='#f7f7f7')).figure
+    ax = None
+    request_id = None
+    camera = (30.0, -60.0, 1.0)  # elevación, azimut, zoom
+    seq = 0
+
+    try:
+        while True:
+            commands = [conn.recv()]
+            while conn.poll():
+                commands.append(conn.recv())
+
+            for command in commands:
+                kind = command[0]
+                if kind == 'quit':
+                    return
+                if kind == 'resize':
+                    width, height = command[1], command[2]
+                    figure.set_size_inches(width / _DPI, height / _DPI)
+                elif kind == 'camera':
+                    camera = command[1:]
+                elif kind == 'load':
+                    _, request_id, filepath, metadata = command
+                    figure.clear()
+                    ax = None
+                    try:
+                        mesh = load_mesh(filepath)
+                        content_hash = asset_store.content_hash(filepath)  # ya calculado por load_mesh
+                        ax = _build_axes(figure, mesh, content_hash, metadata, max_render_faces)
+                    except Exception as e:
+                        conn.send(('error', request_id, f"Error al cargar el modelo:\n{e}"))
+
+            if ax is None:
+                continue
+            elev, azim, zoom = camera
+            ax.view_init(elev=elev, azim=azim)
+            ax.set_box_aspect(None, zoom=zoom)
+            figure.canvas.draw()
+
+            pixels = figure.canvas.buffer_rgba()
+            height, width = pixels.shape[0], pixels.shape[1]
+            seq += 1
+            _FRAME_HEADER.pack_into(shm.buf, 0, 0, width, height)
+            shm.buf[_PIXELS_OFFSET:_PIXELS_OFFSET + width * height * 4] = pixels.tobytes()
+            _FRAME_HEADER.pack_into(shm.buf, 0, seq, width, height)
+            conn.send(('frame', request_id, seq))
+    except (EOFError, KeyboardInterrupt):
+        pass  # la ventana principal se cerró
+    finally:
+        shm.close()
+
+
+def _build_axes(figure, mesh, content_hash, metadata, max_render_faces):
+    """Crea el subplot 3D con el mismo nivel de detalle y ejes que DetailPanel."""
+    points, cells = mesh
+    if len(cells) > max_render_faces:
+        cells = cells[::-(-len(cells) // max_render_faces)]
+
+    x, y, z = points[:, 0], points[:, 1], points[:, 2]
+    ax = figure.add_subplot(111, projection='3d')
+    ax.set_facecolor('#f7f7f7')
+    ax.plot_trisurf(x, y, z, triangles=cells, cmap='viridis', edgecolor='none')
+    bounds = stored_bounds(metadata, content_hash)
+    if bounds:
+        set_axes_limits(ax, *bounds)
+    else:
+        set_axes_limits(ax, (x.min(), y.min(), z.min()), (x.max(), y.max(), z.max()))
+    return ax
+
+
+# --- Lado de la ventana principal ---
+
+class RenderProcess:
+    """
+    Carga y dibuja los modelos 3D en un proceso aparte, para que un .obj
+    enorme o dañado no congele ni tumbe el catálogo.
+
+    Los cuadros llegan por memoria compartida (la tubería solo lleva
+    avisos cortos) y se revisan con 'after', así que Tk nunca espera al
+    proceso. Los comandos de cámara se agrupan: solo hay un cuadro en
+    camino a la vez. Si el proceso muere se vuelve a lanzar y se repite
+    la última carga, hasta 'max_restarts' veces seguidas por modelo. Si
+    llega otra carga mientras el proceso sigue con la anterior (un .obj
+    enorme o colgado), se termina el proceso y se lanza otro en lugar de
+    dejar la nueva carga esperando en la tubería.
+    """
+    poll_ms = 15
+    max_restarts = 2
+    default_camera = (30.0, -60.0, 1.0)  # elevación, azimut, zoom
+
+    def __init__(self, widget, on_frame, on_error, max_render_faces=200_000):
+        self.widget = widget
+        self.on_frame = on_frame  # recibe una imagen de Pillow
+        self.on_error = on_error  # recibe un mensaje de texto
+        self.max_render_faces = max_render_faces
+
+        width, height = MAX_FRAME_SIZE
+        self._shm = shared_memory.SharedMemory(create=True, size=_PIXELS_OFFSET + width * height * 4)
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._conn = None
+        self._after_id = None
+
+        self._request_id = 0
+        self._load = None  # última carga, para repetirla tras un reinicio
+        self._camera = self.default_camera
+        self._size = (640, 480)
+        self._in_flight = False  # hay un cuadro en camino
+        self._dirty = False  # la cámara o el tamaño cambiaron mientras tanto
+        self._loading = False  # la última carga aún no dio cuadro ni error
+        self._restarts = 0
+        self._spawn()
+
+    def _spawn(self):
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=render_worker,
+            args=(child_conn, self._shm.name, self.max_render_faces),
+            name='render-3d',
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._in_flight = False
+        self._conn.send(('resize', *self._size))
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.poll_ms, self._poll)
+
+    def load(self, filepath, metadata=None):
+        """Pide cargar y dibujar un modelo; reemplaza al anterior."""
+        self._request_id += 1
+        self._restarts = 0
+        self._camera = self.default_camera
+        self._load = ('load', self._request_id, filepath, dict(metadata or {}))
+        if self._process is None:
+            self._spawn()  # se había dejado de reiniciar
+        elif self._loading:
+            # El proceso sigue parseando o dibujando la carga anterior
+            self._stop_process(wait=False)
+            self._spawn()
+        self._send_load()
+
+    def rotate(self, d_azim, d_elev):
+        elev, azim, zoom = self._camera
+        self._camera = (max(-90.0, min(90.0, elev + d_elev)), azim + d_azim, zoom)
+        self._request_frame()
+
+    def zoom(self, factor):
+        elev, azim, zoom = self._camera
+        self._camera = (elev, azim, max(0.2, min(5.0, zoom * factor)))
+        self._request_frame()
+
+    def resize(self, width, height):
+        max_width, max_height = MAX_FRAME_SIZE
+        size = (max(1, min(width, max_width)), max(1, min(height, max_height)))
+        if size != self._size:
+            self._size = size
+            self._request_frame()
+
+    def _request_frame(self):
+        if self._load is None:
+            return
+        if self._in_flight:
+            self._dirty = True
+        else:
+            self._send_view()
+
+    def _send_view(self):
+        self._dirty = False
+        self._send(('resize', *self._size))
+        self._send(('camera', *self._camera))
+
+    def _send_load(self):
+        self._send_view()
+        self._send(self._load)
+        self._loading = True
+
+    def _send(self, command):
+        try:
+            self._conn.send(command)
+            self._in_flight = True
+        except (OSError, ValueError):
+            pass  # el proceso murió; _poll lo reinicia
+
+    def _poll(self):
+        self._after_id = None
+        try:
+            while self._conn.poll():
+                self._handle(self._conn.recv())
+        except (EOFError, OSError):
+            pass
+
+        if not self._process.is_alive():
+            self._restart()
+            if self._process is None:
+                return
+        elif self._dirty and not self._in_flight:
+            self._send_view()
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.poll_ms, self._poll)
+
+    def _handle(self, message):
+        kind, request_id = message[0], message[1]
+        self._in_flight = False
+        if request_id != self._request_id:
+            return  # respuesta de una carga anterior
+        self._loading = False
+        if kind == 'frame':
+            image = self._read_frame(message[2])
+            if image is not None:
+                self._restarts = 0
+                self.on_frame(image)
+        elif kind == 'error':
+            self._load = None
+            self.on_error(message[2])
+
+    def _read_frame(self, seq):
+        """Copia el cuadro de la memoria compartida, o None si ya lo sobrescribieron."""
+        header_seq, width, height = _FRAME_HEADER.unpack_from(self._shm.buf, 0)
+        if header_seq != seq:
+            return None
+        pixels = bytes(self._shm.buf[_PIXELS_OFFSET:_PIXELS_OFFSET + width * height * 4])
+        if _FRAME_HEADER.unpack_from(self._shm.buf, 0)[0] != seq:
+            return None  # el proceso empezó otro cuadro mientras se copiaba
+        return Image.frombuffer('RGBA', (width, height), pixels, 'raw', 'RGBA', 0, 1)
+
+    def _restart(self):
+        """
+        Relanza el proceso de render y repite la última carga. Si muere
+        varias veces seguidas sin dibujar nada, se deja de reiniciar hasta
+        la siguiente carga.
+        """
+        print(f"El proceso de render terminó (código {self._process.exitcode}).")
+        self._conn.close()
+        self._restarts += 1
+        self._loading = False
+        if self._restarts > self.max_restarts:
+            self._process = None
+            self._load = None
+            self.on_error("El visor 3D se cerró varias veces seguidas; se volverá a lanzar con el siguiente modelo.")
+            return
+        print("Reiniciando el proceso de render...")
+        self._spawn()
+        if self._load is not None:
+            self._send_load()
+
+    def close(self):
+        """Detiene el proceso y libera la memoria compartida."""
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except Exception:
+                pass  # la ventana ya se destruyó
+            self._after_id = None
+        if self._process is not None:
+            self._stop_process()
+        self._shm.close()
+        self._shm.unlink()
+
+    def _stop_process(self, wait=True):
+        """
+        Detiene el proceso de render. Con wait=False no se le pide salir
+        (puede estar ocupado y no leer la tubería): se termina directamente.
+        """
+        if wait:
+            try:
+                self._conn.send(('quit',))
+            except (OSError, ValueError):
+                pass
+            self._process.join(timeout=2)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join(timeout=1)
+        self._conn.close()
+        self._process = None
+        self._loading = False
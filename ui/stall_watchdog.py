@@ -0,0 +1,116 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+REPORT_FILE = os.path.join(os.getcwd(), 'stall_report.txt')
+
+
+class StallWatchdog:
+    """
+    Detecta cuándo el bucle principal de Tk se queda bloqueado.
+
+    Un callback periódico con 'after' marca un "latido" en el hilo de Tk.
+    Un hilo aparte revisa el latido; si lleva más de 'threshold_ms' sin
+    llegar, toma muestras de la pila del hilo principal con
+    sys._current_frames(). Al salir se escribe un reporte con la duración
+    de los bloqueos y las pilas donde más tiempo se pasó.
+    """
+    def __init__(self, root, threshold_ms=200, heartbeat_ms=50, sample_ms=20,
+                 report_path=REPORT_FILE, max_stack_depth=15):
+        self.root = root
+        self.threshold = threshold_ms / 1000.0
+        self.heartbeat_ms = heartbeat_ms
+        self.sample_interval = sample_ms / 1000.0
+        self.report_path = report_path
+        self.max_stack_depth = max_stack_depth
+
+        self._main_thread_id = threading.main_thread().ident
+        self._last_beat = time.perf_counter()
+        self._after_id = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.stall_durations = []  # segundos, escritos solo desde el hilo de Tk
+        self.stack_samples = Counter()  # pila -> muestras, escritas solo desde el hilo vigilante
+
+    def start(self):
+        """Empieza a vigilar (llamar desde el hilo de Tk)."""
+        self._last_beat = time.perf_counter()
+        self._after_id = self.root.after(self.heartbeat_ms, self._heartbeat)
+        self._thread = threading.Thread(target=self._watch, name='stall-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo vigilante y escribe el reporte (una sola vez)."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass  # la ventana ya se destruyó
+            self._after_id = None
+        self.write_report()
+
+    def _heartbeat(self):
+        now = time.perf_counter()
+        # El latido llegó tarde: el bucle estuvo bloqueado ese tiempo
+        lag = now - self._last_beat - self.heartbeat_ms / 1000.0
+        if lag > self.threshold:
+            self.stall_durations.append(lag)
+        self._last_beat = now
+        self._after_id = self.root.after(self.heartbeat_ms, self._heartbeat)
+
+    def _watch(self):
+        """Hilo vigilante: muestrea la pila del hilo principal si está bloqueado."""
+        while not self._stop_event.wait(self.sample_interval):
+            waited = time.perf_counter() - self._last_beat - self.heartbeat_ms / 1000.0
+            if waited <= self.threshold:
+                continue
+            frame = sys._current_frames().get(self._main_thread_id)
+            if frame is None:
+                continue
+            stack = tuple(
+                f"{os.path.basename(entry.filename)}:{entry.lineno} {entry.name}"
+                for entry in traceback.extract_stack(frame)[-self.max_stack_depth:]
+            )
+            self.stack_samples[stack] += 1
+            del frame
+
+    def write_report(self):
+        """Escribe el resumen de bloqueos y pilas más frecuentes."""
+        durations = sorted(self.stall_durations)
+        lines = ["Reporte de bloqueos del hilo principal", ""]
+        lines.append(f"Umbral: {self.threshold * 1000:.0f} ms")
+        lines.append(f"Bloqueos detectados: {len(durations)}")
+        if durations:
+            total = sum(durations)
+            lines.append(f"Tiempo bloqueado total: {total * 1000:.0f} ms")
+            lines.append(f"Máximo: {durations[-1] * 1000:.0f} ms")
+            lines.append(f"Mediana: {durations[len(durations) // 2] * 1000:.0f} ms")
+            lines.append(f"p95: {durations[int(len(durations) * 0.95)] * 1000:.0f} ms")
+
+        total_samples = sum(self.stack_samples.values())
+        if total_samples:
+            lines.append("")
+            lines.append("Pilas más frecuentes durante los bloqueos:")
+            for stack, samples in self.stack_samples.most_common(10):
+                estimated_ms = samples * self.sample_interval * 1000
+                lines.append("")
+                lines.append(
+                    f"{samples} muestras ({100 * samples / total_samples:.0f}%, ~{estimated_ms:.0f} ms):"
+                )
+                lines.extend(f"    {frame}" for frame in stack)
+
+        try:
+            with open(self.report_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            print(f"Reporte de bloqueos escrito en {self.report_path}")
+        except OSError as e:
+            print(f"No se pudo escribir el reporte de bloqueos: {e}")